@@ -0,0 +1,189 @@
+# Sliding tile puzzle domain for the --domain option of solution.py
+# States are tuples of tiles in row-major order with 0 for the blank. Names use the notation of the 3x3 puzzle maps,
+# rows joined by "_" and "x" for the blank, with tiles above 9 written as letters (a = 10, b = 11, ...)
+# Run as a script, it writes a pattern database heuristic descriptor file for the states of a puzzle state space file
+import argparse
+import os
+from collections import deque
+
+TILE_SYMBOLS = "x123456789abcdefghijklmnopqrstuvwxyz"
+
+
+# Function that returns the moves of the blank, the positions it can move to from every position of a size-by-size board
+def blank_moves(size):
+    res = []
+    for position in range(size * size):
+        row, column = divmod(position, size)
+        neighbours = []
+        if row > 0:
+            neighbours.append(position - size)
+        if row < size - 1:
+            neighbours.append(position + size)
+        if column > 0:
+            neighbours.append(position - 1)
+        if column < size - 1:
+            neighbours.append(position + 1)
+        res.append(neighbours)
+    return res
+
+
+# Class that models a pattern database, the exact solution costs of an abstraction of the puzzle that only tracks a group
+# of tiles and the blank. The positions of the group's tiles are ranked as partial permutations of the cells, so the table
+# is a byte array without gaps indexed by that rank times the number of cells plus the blank position. It is filled by
+# breadth-first search backwards from the goal. Keeping the blank in the abstraction matters, the group's tiles can wall it
+# off from parts of the board and a cost minimized over all blank positions would not be consistent.
+# In an additive database only moves of the group's tiles cost 1, so databases over disjoint groups can be summed.
+# Otherwise every move costs 1 and databases can only be combined by taking their maximum
+class PatternDatabase:
+    def __init__(self, size, goal, tiles, additive=True, directory=None):
+        self.cells = size * size
+        self.tiles = tuple(tiles)
+        self.additive = additive
+        file_name = None
+        if directory is not None:
+            file_name = os.path.join(directory, "pdb_{}_{}_{}.bin".format(
+                "".join(TILE_SYMBOLS[tile] for tile in goal), "".join(TILE_SYMBOLS[tile] for tile in self.tiles),
+                "additive" if additive else "max"))
+            if os.path.exists(file_name):
+                with open(file_name, "rb") as input_file:
+                    self.table = bytearray(input_file.read())
+                return
+        self.table = self.build(blank_moves(size), goal)
+        if file_name is not None:
+            with open(file_name, "wb") as output_file:
+                output_file.write(self.table)
+
+    # Method that ranks the positions of the group's tiles, a partial permutation of the cells, to a dense index
+    def rank(self, positions):
+        res = 0
+        for i, position in enumerate(positions):
+            res = res * (self.cells - i) + position - sum(1 for previous in positions[:i] if previous < position)
+        return res
+
+    # Method that fills the table by 0-1 breadth-first search from the goal, moves are reversible so this gives costs to it
+    def build(self, moves, goal):
+        cells = self.cells
+        positions = tuple(goal.index(tile) for tile in self.tiles)
+        blank = goal.index(0)
+        placements = 1 # Number of ways to place the group's tiles on the board
+        for i in range(len(self.tiles)):
+            placements *= cells - i
+        distances = bytearray(b"\xff") * (placements * cells)
+        distances[self.rank(positions) * cells + blank] = 0
+        opened = deque([(0, self.rank(positions), positions, blank)])
+        while opened:
+            distance, rank, positions, blank = opened.popleft()
+            if distance > distances[rank * cells + blank]:
+                continue
+            for position in moves[blank]:
+                if position in positions: # The blank swaps places with one of the group's tiles
+                    child = tuple(blank if tile_position == position else tile_position for tile_position in positions)
+                    child_rank = self.rank(child)
+                    if distance + 1 < distances[child_rank * cells + position]:
+                        distances[child_rank * cells + position] = distance + 1
+                        opened.append((distance + 1, child_rank, child, position))
+                else:
+                    cost = 0 if self.additive else 1
+                    if distance + cost < distances[rank * cells + position]:
+                        distances[rank * cells + position] = distance + cost
+                        if cost:
+                            opened.append((distance + cost, rank, positions, position))
+                        else:
+                            opened.appendleft((distance, rank, positions, position))
+        return distances
+
+    # Method that looks up the cost of a state given as the position of every tile, the blank included
+    def lookup(self, where):
+        return self.table[self.rank([where[tile] for tile in self.tiles]) * self.cells + where[0]]
+
+
+# Class that models an n-by-n sliding tile puzzle, the default start state is the initial state of 3x3_puzzle.txt
+# The heuristic is the Manhattan distance, or pattern databases ("additive" or "max") over tile groups given as a partition
+# like "1,2,3,4/5,6,7,8", by default groups of at most 4 tiles on the 3x3 board and 5 tiles on larger ones.
+# Pattern database tables are kept in pdb_directory when it is given, so later runs do not build them again
+class SlidingPuzzle:
+    def __init__(self, start="876_543_21x", goal=None, heuristic="manhattan", partition=None, pdb_directory=None):
+        rows = start.split("_")
+        self.size = len(rows)
+        self.start = self.parse(start)
+        if goal is None:
+            goal = tuple(range(1, self.size * self.size)) + (0,)
+        else:
+            goal = self.parse(goal)
+        self.goal = goal
+        # Goal row and column of every tile, used by the Manhattan distance heuristic
+        self.goal_position = [divmod(goal.index(tile), self.size) for tile in range(self.size * self.size)]
+        self.moves = blank_moves(self.size) # Positions the blank can move to from every position
+        self.databases = []
+        if heuristic != "manhattan":
+            if heuristic not in ("additive", "max"):
+                raise ValueError("unknown heuristic {}".format(heuristic))
+            if partition is None:
+                tiles = list(range(1, self.size * self.size))
+                group = 4 if self.size == 3 else 5
+                groups = [tiles[i:i + group] for i in range(0, len(tiles), group)]
+            else:
+                groups = [[TILE_SYMBOLS.index(tile) for tile in group.split(",")] for group in partition.split("/")]
+            self.databases = [PatternDatabase(self.size, self.goal, group, heuristic == "additive", pdb_directory) for group in groups]
+            self.combine = sum if heuristic == "additive" else max
+
+    # Method that converts a state name to a state
+    def parse(self, name):
+        return tuple(TILE_SYMBOLS.index(symbol) for symbol in name.replace("_", ""))
+
+    def name(self, state):
+        return "_".join("".join(TILE_SYMBOLS[tile] for tile in state[row:row + self.size]) for row in range(0, len(state), self.size))
+
+    def initial_state(self):
+        return self.start
+
+    def is_goal(self, state):
+        return state == self.goal
+
+    # Method that yields the states reachable by sliding one tile into the blank, every move costs 1
+    def successors(self, state):
+        blank = state.index(0)
+        for position in self.moves[blank]:
+            child = list(state)
+            child[blank], child[position] = child[position], 0
+            yield tuple(child), 1.0
+
+    # Method that computes the heuristic, the pattern database lookup or the sum of the distances of the tiles from their
+    # goal positions
+    def heuristic(self, state):
+        if self.databases:
+            where = [0] * len(state)
+            for position, tile in enumerate(state):
+                where[tile] = position
+            return float(self.combine(database.lookup(where) for database in self.databases))
+        res = 0
+        for position, tile in enumerate(state):
+            if tile:
+                row, column = divmod(position, self.size)
+                goal_row, goal_column = self.goal_position[tile]
+                res += abs(row - goal_row) + abs(column - goal_column)
+        return float(res)
+
+
+# Function that writes a heuristic descriptor file with the pattern database values of every state of a puzzle state space
+# file, whose states are named in the notation of this module
+def main():
+    parser = argparse.ArgumentParser(description="Write a pattern database heuristic for a sliding puzzle state space")
+    parser.add_argument("statespace", type=str, help="state space descriptor file")
+    parser.add_argument("heuristic", type=str, help="heuristic descriptor file to write")
+    parser.add_argument("--pdb", type=str, required=False, default="additive", choices=["additive", "max"],
+                        help="how the pattern databases are combined")
+    parser.add_argument("--partition", type=str, required=False,
+                        help="tile groups of the pattern databases, e.g. 1,2,3,4/5,6,7,8")
+    args = parser.parse_args()
+    with open(args.statespace, "r") as input_file:
+        lines = [line.strip() for line in input_file if line[0] != "#"]
+    puzzle = SlidingPuzzle(lines[0], lines[1].split()[0], args.pdb, args.partition)
+    with open(args.heuristic, "w") as output_file:
+        for line in lines[2:]:
+            name = line.split(":")[0]
+            output_file.write("{}: {}\n".format(name, int(puzzle.heuristic(puzzle.parse(name)))))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,63 +1,847 @@
 import argparse
-from queue import PriorityQueue, Queue
+import copy
+import glob
+import hashlib
+import importlib
+import importlib.util
+import io
+import json
+import mmap
+import multiprocessing
+import os
+import queue
+import signal
+import socketserver
+import sqlite3
+import stat
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from collections import deque
+from contextlib import contextmanager, nullcontext, redirect_stdout
+from functools import lru_cache, partial, wraps
+from heapq import heapify, heappop, heappush, merge
+from itertools import chain, compress, count, filterfalse, repeat
+from math import inf, isfinite
+from operator import add, le, lt, sub
 
-# Class that represents nodes in the search tree
+try:
+    import resource
+except ImportError: # Not available on Windows, peak memory is then left out of the statistics
+    resource = None
+
+# Frontier of states waiting for expansion, kept as a binary heap of (f, state ID) entries, optionally followed by a Link
+# Since state IDs follow name order, ties on f are broken by state name
+class PriorityFrontier:
+    def __init__(self):
+        self.items = []
+        self.push = partial(heappush, self.items)
+        self.pop = partial(heappop, self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+# Frontier that expands state IDs in the order they were added, used by BFS
+class FifoFrontier:
+    def __init__(self):
+        self.items = deque()
+        self.push = self.items.append
+        self.pop = self.items.popleft
+
+    def __len__(self):
+        return len(self.items)
+
+# Link from a frontier entry to the state it was generated from, and the cost of the path through it
+# Links take no part in ordering the frontier - every link compares equal to every other one, so entries with the same
+# priority and state are ordered by their position in the heap alone, exactly like the Node objects the searches used to push
+class Link:
+    __slots__ = ("parent", "cost")
+
+    def __init__(self, parent, cost):
+        self.parent = parent
+        self.cost = cost
+
+    def __eq__(self, other):
+        return True
+
+# Frontier stand-in that counts what passes through a frontier for the search statistics
+# Searches use it in place of their frontier only while statistics are collected, so they otherwise run the plain frontier
+# methods. A popped state counts as expanded with all the transitions of its row generated, except for stale entries of
+# frontiers with lazy deletion, whose (f, state) entries are stale when the state was closed before the entry was popped
+class FrontierProbe:
+    def __init__(self, frontier, offsets, closed=None):
+        self.items = frontier.items
+        self.inner_push, self.inner_pop = frontier.push, frontier.pop
+        self.offsets = offsets
+        self.closed = closed
+        self.seeds = 0 # Entries pushed before the first pop
+        self.pushes = 0
+        self.pops = 0
+        self.stale = 0
+        self.expansions = 0
+        self.generations = 0
+        self.peak = 0
+
+    def push(self, *entry):
+        self.inner_push(*entry)
+        self.pushes += 1
+        if not self.pops:
+            self.seeds += 1
+        if len(self.items) > self.peak:
+            self.peak = len(self.items)
+
+    def pop(self):
+        entry = self.inner_pop()
+        self.pops += 1
+        state = entry
+        if self.closed is not None:
+            state = entry[1]
+            if self.closed[state]:
+                self.stale += 1
+                return entry
+        self.expansions += 1
+        self.generations += self.offsets[state + 1] - self.offsets[state]
+        return entry
+
+    # Method that takes back the expansion of a popped state that was not expanded, the goal a search stopped at
+    def unexpand(self, state):
+        self.expansions -= 1
+        self.generations -= self.offsets[state + 1] - self.offsets[state]
+
+# Statistics of a run for --stats - wall time per phase and the counters of every search, written as a JSON document
+# Searches register the probe of their frontier, and time spent in a phase nested in another one counts for both
+class SearchStats:
+    def __init__(self):
+        self.phases = dict()
+        self.searches = []
+        self.probe = None
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    # Method that wraps the frontier of a search in a probe, and remembers the probe for the search record
+    def watch(self, frontier, offsets, closed=None):
+        self.probe = FrontierProbe(frontier, offsets, closed)
+        return self.probe
+
+    # Method that runs a search method and records its time and counters
+    def measure(self, problem, traverse, args, kwargs):
+        self.probe = None
+        with self.phase("search"):
+            start = time.perf_counter()
+            res = traverse(problem, *args, **kwargs)
+            elapsed = time.perf_counter() - start
+        record = {"search": traverse.__name__, "heuristic": problem.file_heuristic or None, "seconds": elapsed}
+        probe = self.probe
+        if probe is not None:
+            if isinstance(res, SearchResult) and res.goal is not None:
+                probe.unexpand(res.goal)
+            # A generated state is a duplicate unless it was added to the frontier
+            record.update(expansions=probe.expansions, generations=probe.generations,
+                          duplicates=probe.generations - (probe.pushes - probe.seeds), stale_pops=probe.stale,
+                          max_frontier=probe.peak)
+        record["peak_rss_kb"] = self.peak_rss()
+        self.searches.append(record)
+        return res
+
+    # Method that returns the peak resident set size of the process in kilobytes, None where it cannot be read
+    @staticmethod
+    def peak_rss():
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == "darwin" else peak # Reported in bytes on macOS
+
+    # Method that writes the statistics to a file, or to standard error for "-"
+    def write(self, file_name):
+        document = json.dumps({"phases": self.phases, "searches": self.searches, "peak_rss_kb": self.peak_rss()}, indent=2)
+        if file_name == "-":
+            print(document, file=sys.stderr)
+        else:
+            with open(file_name, "w") as output_file:
+                output_file.write(document + "\n")
+
+# Limits on a search - expansions, seconds of wall time and megabytes of peak memory of the process, None for no limit
+# Searches only compare their expansion count against the next checkpoint, the clock and the memory are read at checkpoints,
+# every BUDGET_CHECK_INTERVAL expansions. The reason of the last check that failed is kept for the result
+class SearchBudget:
+    def __init__(self, expansions=None, seconds=None, memory_mb=None):
+        self.expansions = expansions
+        self.seconds = seconds
+        self.memory_mb = memory_mb
+        self.deadline = None
+        self.reason = None
+
+    # Method that starts the clock of a search - outputs the first checkpoint
+    def start(self):
+        self.reason = None
+        self.deadline = None if self.seconds is None else time.monotonic() + self.seconds
+        return self.next_checkpoint(0)
+
+    def next_checkpoint(self, expansions):
+        res = expansions + BUDGET_CHECK_INTERVAL
+        if self.expansions is not None:
+            res = min(res, self.expansions)
+        return res
+
+    # Method that checks the limits after the given number of expansions - outputs the next checkpoint, or None when a limit
+    # is reached
+    def check(self, expansions):
+        if self.expansions is not None and expansions >= self.expansions:
+            self.reason = "max_expansions"
+        elif self.deadline is not None and time.monotonic() >= self.deadline:
+            self.reason = "max_seconds"
+        elif self.memory_mb is not None and SearchStats.peak_rss() >= self.memory_mb * 1024:
+            self.reason = "max_memory_mb"
+        else:
+            return self.next_checkpoint(expansions)
+        return None
+
+# Result of a traversal - goal state ID (None if no goal was reached), number of closed states,
+# and the per-state cost and parent arrays used for path reconstruction
+# Searches that do not keep a single parent array, like the bidirectional ones, pass the path of state IDs as route
+# Memory-bounded searches also report the largest frontier they had to hold
+class SearchResult:
+    __slots__ = ("goal", "visited", "cost", "parent", "route", "peak_frontier", "bound", "aborted", "f_bound")
+
+    def __init__(self, goal, visited, cost, parent, route=None, peak_frontier=None, bound=None):
+        self.goal = goal
+        self.visited = visited
+        self.cost = cost
+        self.parent = parent
+        self.route = route
+        self.peak_frontier = peak_frontier
+        self.bound = bound # Factor by which the cost may exceed the optimal one, for the suboptimal searches
+        self.aborted = None # Limit that stopped the search before it finished, the route is then the best partial path if any
+        self.f_bound = None # Lowest cost a solution could still have when the search was aborted, if known
+
+# Error in the inputs of a run that only shows once the state space is read, like a state name it does not have
+# It is reported as a usage error instead of a traceback
+class InputError(ValueError):
+    pass
+
+# Class that represents nodes in the search tree of SMA-star, the only search that keeps an explicit tree
 class Node:
-    def __init__(self, parent, name, transition_cost, heuristic=None):
+    __slots__ = ("state", "cost", "f", "depth", "parent", "children", "edge", "cursor", "forgotten", "key", "mark")
+
+    def __init__(self, parent, state, transition_cost, f):
         if parent:
             self.cost = parent.cost + transition_cost
-            self.parent_name = parent.name
+            self.depth = parent.depth + 1
         else:
             self.cost = 0
-            self.parent_name = "#"
-        self.name = name
-        self.heuristic = heuristic
-
-    # Less than relation defined so that Node class could be used in PriorityQueue
-    def __lt__(self, node2):
-        if self.heuristic: # If the heuristic is given, the nodes will be sorted by the sum of node cost and value of the heuristic function
-            if (self.cost + self.heuristic[self.name]) == (node2.cost + self.heuristic[node2.name]):
-                return self.name < node2.name
-            return (self.cost + self.heuristic[self.name]) < (node2.cost + self.heuristic[node2.name])
-        else: # If no heuristic is given, the nodes will be sorted only by cost
-            if self.cost == node2.cost:
-                return self.name < node2.name
-            return self.cost < node2.cost
-
-    def __eq__(self, node2):
-        return self.name == node2.name and self.cost == node2.cost
+            self.depth = 0
+        self.parent = parent
+        self.state = state
+        self.f = f
+        self.children = []
+        self.edge = -1 # Transition the node was generated by
+        self.cursor = -1 # Next transition of the state to generate a successor from
+        self.forgotten = inf # Lowest f of the children that were dropped from memory
+        self.key = -1 # Sequence number of the frontier entry of the node, -1 while it is not in the frontier
+        self.mark = -1 # Sequence number of the leaf entry of the node, -1 while it has children or is not held
+
+# Run of fixed-size records in a temporary file, the unit external-memory searches spill to disk
+# Records are tuples packed with the given struct layout. Runs that are sorted are kept in tuple order, so the first field
+# is the key that find looks up
+class SpillRun:
+    def __init__(self, directory, layout, records=()):
+        handle, self.file_name = tempfile.mkstemp(suffix=".run", dir=directory)
+        self.layout = layout
+        self.size = 0
+        self.output_file = os.fdopen(handle, "wb")
+        self.input_file = None
+        self.extend(records)
+
+    def __len__(self):
+        return self.size
+
+    # Method that writes records at the end of the run, before it is read
+    def extend(self, records):
+        pack, write = self.layout.pack, self.output_file.write
+        size = self.size
+        for record in records:
+            write(pack(*record))
+            size += 1
+        self.size = size
+
+    # Method that yields the records of the run in file order, reading it in large chunks
+    def __iter__(self):
+        self.seal()
+        chunk = self.layout.size * SPILL_CHUNK_RECORDS
+        with open(self.file_name, "rb") as input_file:
+            while True:
+                data = input_file.read(chunk)
+                if not data:
+                    break
+                yield from self.layout.iter_unpack(data)
+
+    # Method that finishes writing, after which records can be read
+    def seal(self):
+        if self.input_file is None:
+            self.output_file.close()
+            self.input_file = open(self.file_name, "rb")
+
+    # Method that reads the record at the given position
+    def record(self, index):
+        self.seal()
+        self.input_file.seek(index * self.layout.size)
+        return self.layout.unpack(self.input_file.read(self.layout.size))
+
+    # Method that finds the record with the given key by binary search in a sorted run, returns None if there is none
+    def find(self, key):
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self.record(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.size:
+            res = self.record(low)
+            if res[0] == key:
+                return res
+        return None
+
+    def remove(self):
+        self.seal()
+        self.input_file.close()
+        os.remove(self.file_name)
+
+# Set of records of closed states, kept as sorted runs in temporary files for external-memory searches
+# Newly closed states are added as a run, and runs are merged whenever the last one is at least half as long as the one
+# before it, so there are only logarithmically many runs. Duplicates are detected late, by filtering a sorted batch of
+# records against every run: merging along the run, or looking every record up when the batch is much smaller
+class SpillSet:
+    def __init__(self, directory):
+        self.directory = directory
+        self.runs = []
+
+    def __len__(self):
+        return sum(map(len, self.runs))
+
+    def add(self, run):
+        runs = self.runs
+        runs.append(run)
+        while len(runs) > 1 and 2 * len(runs[-1]) >= len(runs[-2]):
+            newer, older = runs.pop(), runs.pop()
+            runs.append(SpillRun(self.directory, older.layout, merge(older, newer)))
+            older.remove()
+            newer.remove()
+
+    # Method that yields the records of a batch sorted by key, of at most the given count, whose keys are not in the set
+    def exclude(self, records, count):
+        for run in self.runs:
+            if count * len(run).bit_length() < len(run):
+                records = self.unknown(records, run)
+            else:
+                records = self.without(records, run)
+        return records
+
+    @staticmethod
+    def unknown(records, run):
+        for record in records:
+            if run.find(record[0]) is None:
+                yield record
+
+    @staticmethod
+    def without(records, run):
+        keys = iter(run)
+        key = next(keys, None)
+        for record in records:
+            while key is not None and key[0] < record[0]:
+                key = next(keys, None)
+            if key is None or key[0] != record[0]:
+                yield record
+
+    def find(self, key):
+        for run in self.runs:
+            res = run.find(key)
+            if res is not None:
+                return res
+        return None
+
+    def remove(self):
+        for run in self.runs:
+            run.remove()
+        self.runs = []
+
+# Priority queue of records for external-memory searches, ordered by their first field
+# Records wait in a binary heap until it holds capacity records, then the heap is sorted and spilled as a run.
+# A batch of the lowest records is popped at once, from the heap and from the heads of all runs
+class SpillQueue:
+    def __init__(self, directory, layout, capacity):
+        self.directory = directory
+        self.layout = layout
+        self.capacity = capacity
+        self.items = []
+        self.heads = [] # Next record, record iterator and run of every spilled run
+
+    def __len__(self):
+        return len(self.items) + len(self.heads)
+
+    def push(self, record):
+        items = self.items
+        heappush(items, record)
+        if len(items) >= self.capacity:
+            items.sort()
+            run = SpillRun(self.directory, self.layout, items)
+            records = iter(run)
+            self.heads.append([next(records), records, run])
+            items.clear()
+
+    # Method that returns the lowest key in the queue
+    def low(self):
+        return min(chain(self.items[:1], (head[0] for head in self.heads)))[0]
+
+    # Method that yields all records with keys below the bound, or up to it when inclusive, removing them from the queue
+    def pop_below(self, bound, inclusive=False):
+        within = le if inclusive else lt
+        items = self.items
+        while items and within(items[0][0], bound):
+            yield heappop(items)
+        for head in self.heads:
+            while head[0] is not None and within(head[0][0], bound):
+                yield head[0]
+                head[0] = next(head[1], None)
+        for head in [head for head in self.heads if head[0] is None]:
+            head[2].remove()
+            self.heads.remove(head)
+
+    def remove(self):
+        for head in self.heads:
+            head[1].close()
+            head[2].remove()
+        self.heads = []
+
+
+# Function that sorts records that may not fit in memory, holding at most capacity of them at once
+# Sorted runs of capacity records are spilled and merged - outputs an iterable of the sorted records and their count
+def external_sort(records, layout, capacity, directory):
+    runs = []
+    buffer = []
+    total = 0
+    for record in records:
+        buffer.append(record)
+        if len(buffer) >= capacity:
+            buffer.sort()
+            runs.append(SpillRun(directory, layout, buffer))
+            total += len(buffer)
+            buffer = []
+    buffer.sort()
+    total += len(buffer)
+    if not runs:
+        return buffer, total
+    runs.append(SpillRun(directory, layout, buffer))
+    return merge_runs(runs), total
+
+
+# Function that merges sorted runs, removing them once they have been read
+def merge_runs(runs):
+    try:
+        yield from merge(*runs)
+    finally:
+        for run in runs:
+            run.remove()
+
+
+# Function that yields the first of every group of records with the same key, from records sorted by key
+def first_records(records):
+    previous = None
+    for record in records:
+        if record[0] != previous:
+            previous = record[0]
+            yield record
+
+# Layout of the binary cache headers - magic, source size, source modification time, source SHA-256 digest, followed by
+# state count, edge count, goal count, length of the state name table and initial state ID for state spaces,
+# state space digest and state count for heuristics, or state count for the oracle heuristic of a state space
+STATESPACE_CACHE_MAGIC = b"L1SS" + sys.byteorder[0].encode() + b"003"
+STATESPACE_CACHE_HEADER = struct.Struct("=8sqq32sqqqqq")
+HEURISTIC_CACHE_MAGIC = b"L1HE" + sys.byteorder[0].encode() + b"001"
+HEURISTIC_CACHE_HEADER = struct.Struct("=8sqq32s32sq")
+ORACLE_CACHE_MAGIC = b"L1HS" + sys.byteorder[0].encode() + b"001"
+ORACLE_CACHE_HEADER = struct.Struct("=8sqq32sq")
+ORACLE_CACHE_SUFFIX = ".hstar.cache"
+LANDMARK_CACHE_MAGIC = b"L1LM" + sys.byteorder[0].encode() + b"002"
+LANDMARK_CACHE_HEADER = struct.Struct("=8sqq32sqqq")
+LANDMARK_CACHE_SUFFIX = ".landmarks.cache"
+HIERARCHY_CACHE_MAGIC = b"L1CH" + sys.byteorder[0].encode() + b"001"
+HIERARCHY_CACHE_HEADER = struct.Struct("=8sqq32sqqq")
+HIERARCHY_CACHE_SUFFIX = ".ch.cache"
+# Layouts of the records external-memory searches spill to temporary files, and the number of records read at once
+# BFS levels hold (state, rank of the parent in the previous level, cost) in queue order, and generated states are sorted as
+# (state, parent rank, transition, cost) to find the first entry of each state, then as (parent rank, transition, state, cost)
+# to restore queue order. UCS keeps (cost, state, parent cost, parent) frontier entries and (state, cost, parent cost, parent)
+# closed states
+SPILL_LEVEL_RECORD = struct.Struct("=iqd")
+SPILL_CANDIDATE_RECORD = struct.Struct("=iqqd")
+SPILL_QUEUED_RECORD = struct.Struct("=qqid")
+SPILL_STATE_RECORD = struct.Struct("=i")
+SPILL_FRONTIER_RECORD = struct.Struct("=didi")
+SPILL_CLOSED_RECORD = struct.Struct("=iddi")
+SPILL_CHUNK_RECORDS = 4096
+SPILL_RECORD_MEMORY = 128 # Rough number of bytes a record tuple takes while it is held in memory
+# Successors an HDA-star worker collects for another worker before sending them, also the number of expansions between
+# checks of its queue, and the seconds between termination checks
+HDA_STAR_BATCH = 128
+HDA_STAR_POLL = 0.001
+# Expansions between checks of the clock and the memory of searches with limits
+BUDGET_CHECK_INTERVAL = 1024
+# Landmarks of the ALT heuristic in serve mode when neither --landmarks nor the request gives their number
+ALT_LANDMARKS = 8
+# Traversal methods answering the requests of serve mode, and the ones among them that need a heuristic
+SERVE_ALGORITHMS = {"bfs": "bfs_traverse", "ucs": "ucs_traverse", "astar": "a_star_traverse", "bidir-ucs": "bidirectional_ucs_traverse",
+                    "bidir-bfs": "bidirectional_bfs_traverse", "idastar": "ida_star_traverse", "smastar": "sma_star_traverse", "ch": "ch_traverse",
+                    "wastar": "a_star_traverse", "alt": "a_star_traverse"}
+SERVE_HEURISTIC_ALGORITHMS = ("astar", "idastar", "smastar", "wastar")
+# Options that do not change the report of a run, so they are left out of result cache keys
+RESULT_CACHE_IGNORED = ("ss", "h", "jobs", "no_cache", "result_cache", "result_cache_size", "heuristic_cache", "memory_ceiling",
+                        "spill_dir")
+
+# Decorator for search methods of a state space that records them in the statistics of the run when they are collected
+def measured_search(traverse):
+    @wraps(traverse)
+    def measured(self, *args, **kwargs):
+        if self.stats is None:
+            return traverse(self, *args, **kwargs)
+        return self.stats.measure(self, traverse, args, kwargs)
+    return measured
+
+
+# Decorator for methods of a state space that times them as a phase of the run when statistics are collected
+def timed_phase(name):
+    def decorator(method):
+        @wraps(method)
+        def timed(self, *args, **kwargs):
+            if self.stats is None:
+                return method(self, *args, **kwargs)
+            with self.stats.phase(name):
+                return method(self, *args, **kwargs)
+        return timed
+    return decorator
+
 
 # Class that models the state space of the problem
 class StateSpace:
-    def __init__(self, file_statespace, file_heuristic=""):
+    stats = None # SearchStats of the run when --stats is given
+    budget = None # SearchBudget of the searches when limits are given
+
+    def __init__(self, file_statespace, file_heuristic="", use_cache=True):
         self.file_statespace = file_statespace
         self.file_heuristic = file_heuristic
+        self.clear_derived()
+        self.prune_dead_ends = False # Whether BFS, UCS and A-star skip successors that cannot reach a goal
+
+        # A fresh binary cache written by compile_cache is memory-mapped instead of parsing the descriptor files
+        if not (use_cache and self.load_statespace_cache()):
+            self.parse_statespace()
+        if file_heuristic:
+            self.load_heuristic(file_heuristic, use_cache)
+
+    # Method that resets the values derived from the graph, which are only computed when something asks for them
+    def clear_derived(self):
+        self._transitions = None
+        self._transpose = None
+        self._heuristic = None
+        self._h_star = None
+        self._edge_sources = None
+        self._name_graph = None
+        self._hierarchy = None
+        self._alive = None
+        self._live_graph = None
+        self._landmarks = dict() # Landmark tables by the number of landmarks asked for, shared by shallow copies
+        self._graph_digest = None
+        self.digest = None # SHA-256 of the state space descriptor file, only computed when a cache needs it
+
+    # Method that builds a state space from an edge list over state names instead of a descriptor file
+    # Sources and targets are indices into names, the name given as description is used in place of the file name
+    @classmethod
+    def from_edges(cls, description, init, goals, names, sources, targets, costs):
+        res = cls.__new__(cls)
+        res.file_statespace = description
+        res.file_heuristic = ""
+        res.clear_derived()
+        res.prune_dead_ends = False
+        res.init = init
+        res.goals = set(goals)
+        res.build_graph(names, sources, targets, costs)
+        return res
+
+    # Method that switches the state space to another heuristic descriptor file, the parsed state space is kept
+    @timed_phase("heuristic_load")
+    def load_heuristic(self, file_heuristic, use_cache=True):
+        self.file_heuristic = file_heuristic
+        self._heuristic = None
+        if not (use_cache and self.load_heuristic_cache()):
+            self.parse_heuristic()
 
-        # Parsing the state space descriptor file
-        with open(file_statespace, "r") as input_file1:
+    # Method that parses the state space descriptor file
+    # States are interned to dense integer IDs and the transition relation is stored in compressed sparse row (CSR) arrays
+    def parse_statespace(self):
+        with open(self.file_statespace, "r") as input_file1:
             self.init = self.readline_clean(input_file1)
             self.goals = set(self.readline_clean(input_file1).split(" "))
-            self.transitions = dict()
-            self.transpose = dict() # Transpose dictionary is used for dijkstra's algorithm, it represents the reversed transition relation
-            for line in input_file1.readlines():
-                if line[0] == "#":
+            ids = dict() # Provisional IDs in order of appearance, renumbered once all states are known
+            sources = array("i")
+            targets = array("i")
+            costs = array("d")
+            for state in [self.init] + sorted(self.goals):
+                ids.setdefault(state, len(ids))
+            for line in input_file1:
+                if line[0] == "#" or not line.strip():
                     continue
                 transition = line.strip().split(" ")
+                source = ids.setdefault(transition[0][:-1], len(ids))
                 for i in range(1, len(transition)):
                     child = transition[i].split(",")
-                    self.transitions.setdefault(transition[0][:-1], []).append((child[0], float(child[1])))
-                    self.transpose.setdefault(child[0],[]).append((transition[0][:-1], float(child[1])))
-                self.transitions.setdefault(transition[0][:-1], []) # In case of empty transition
-        
-        # Parsing the heuristic descriptor file
-        if file_heuristic:
-            with open(file_heuristic, "r") as input_file2:
-                self.heuristic = dict()
-                for line in input_file2.readlines():
-                    if line[0] == "#":
-                        continue
-                    pair = line.strip().split(": ")
-                    self.heuristic[pair[0]] = float(pair[1])
+                    sources.append(source)
+                    targets.append(ids.setdefault(child[0], len(ids)))
+                    costs.append(float(child[1]))
+            names = list(ids)
+        self.build_graph(names, sources, targets, costs)
+
+    # Method that interns the states of an edge list and builds the CSR arrays of the transition relation and its transpose
+    def build_graph(self, names, sources, targets, costs):
+        # Renumbering the states so that ID order matches name order - comparing IDs then breaks ties exactly like comparing names
+        order = sorted(range(len(names)), key=names.__getitem__)
+        rank = array("i", bytes(4 * len(names)))
+        for new_id, old_id in enumerate(order):
+            rank[old_id] = new_id
+        sources = array("i", map(rank.__getitem__, sources))
+        targets = array("i", map(rank.__getitem__, targets))
+        self.names = [names[old_id] for old_id in order]
+        self.ids = {name: state_id for state_id, name in enumerate(self.names)}
+        self.init_id = self.ids[self.init]
+        self.goal_ids = set(self.ids[goal] for goal in self.goals)
+
+        # Forward edges are used by the searches, reversed edges (the transpose graph) by dijkstra's algorithm
+        # Adjacency lists keep the order of the descriptor file, which is the order UCS and A-star push successors in
+        self.offsets, self.targets, self.costs = self.build_csr(len(self.names), sources, targets, costs)
+        self.transpose_offsets, self.transpose_targets, self.transpose_costs = self.build_csr(len(self.names), targets, sources, costs)
+
+    # Method that parses the heuristic descriptor file into a vector of values indexed by state ID
+    # States missing from the descriptor file get 0 and are not reported by the heuristic checks
+    def parse_heuristic(self):
+        self.h = array("d", bytes(8 * len(self.names)))
+        self.h_defined = bytearray(len(self.names))
+        with open(self.file_heuristic, "r") as input_file2:
+            for line in input_file2:
+                if line[0] == "#":
+                    continue
+                pair = line.strip().split(": ")
+                state_id = self.ids.get(pair[0])
+                if state_id is not None:
+                    self.h[state_id] = float(pair[1])
+                    self.h_defined[state_id] = 1
+
+    # Dictionary view of the heuristic, mapping state names to values
+    @property
+    def heuristic(self):
+        if self._heuristic is None:
+            self._heuristic = {self.names[state_id]: self.h[state_id] for state_id in range(len(self.names)) if self.h_defined[state_id]}
+        return self._heuristic
+
+    # Path of a binary cache that belongs to a descriptor file
+    @staticmethod
+    def cache_path(file_name, suffix=".cache"):
+        return file_name + suffix
+
+    # Method that returns the SHA-256 digest of a file
+    @staticmethod
+    def file_digest(file_name):
+        with open(file_name, "rb") as input_file:
+            return hashlib.sha256(input_file.read()).digest()
+
+    # Method that returns the SHA-256 of the graph - the state names and the CSR arrays of the transitions, without the
+    # initial and goal states - for caches of tables that only depend on the graph
+    def graph_digest(self):
+        if self._graph_digest is None:
+            digest = hashlib.sha256("\n".join(self.names).encode("utf-8"))
+            for column in (self.offsets, self.targets, self.costs):
+                digest.update(memoryview(column).cast("B"))
+            self._graph_digest = digest.digest()
+        return self._graph_digest
+
+    # Method that maps a cache file into memory and checks it against its source descriptor file
+    # Returns the mapped cache and the offset of its body, or None if the cache is missing or stale
+    # Unchanged size and modification time are trusted, otherwise the source is hashed and compared with the stored digest.
+    # Caches that only depend on part of the source store the digest of that part, which is then given and compared instead
+    @staticmethod
+    def open_cache(file_name, magic, header, suffix=".cache", digest=None):
+        try:
+            with open(StateSpace.cache_path(file_name, suffix), "rb") as cache_file:
+                mapped = mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(mapped) < header.size or mapped[:len(magic)] != magic:
+            return None
+        fields = header.unpack_from(mapped)
+        if digest is not None:
+            return (mapped, fields) if fields[3] == digest else None
+        source = os.stat(file_name)
+        if (fields[1], fields[2]) != (source.st_size, source.st_mtime_ns) and fields[3] != StateSpace.file_digest(file_name):
+            return None
+        return mapped, fields
+
+    # Method that loads the state space from its cache, returns False if there is no fresh cache
+    def load_statespace_cache(self):
+        opened = self.open_cache(self.file_statespace, STATESPACE_CACHE_MAGIC, STATESPACE_CACHE_HEADER)
+        if opened is None:
+            return False
+        mapped, fields = opened
+        _, _, _, self.digest, size, edges, goals, names_length, self.init_id = fields
+        sections = memoryview(mapped)
+        position = STATESPACE_CACHE_HEADER.size
+        def section(typecode, count):
+            nonlocal position
+            length = count * array(typecode).itemsize
+            res = sections[position:position + length].cast(typecode)
+            position += -(-length // 8) * 8 # Sections are aligned to 8 bytes
+            return res
+        self.names = str(section("B", names_length), "utf-8").split("\n") if size else []
+        self.goal_ids = set(section("i", goals))
+        self.offsets, self.targets, self.costs = section("q", size + 1), section("i", edges), section("d", edges)
+        self.transpose_offsets, self.transpose_targets, self.transpose_costs = section("q", size + 1), section("i", edges), section("d", edges)
+        self._alive = section("B", size)
+        self.ids = {name: state_id for state_id, name in enumerate(self.names)}
+        self.init = self.names[self.init_id]
+        self.goals = set(self.names[goal] for goal in self.goal_ids)
+        self.cache_map = mapped # The arrays above are views into the mapping, so it has to stay open
+        return True
+
+    # Method that cuts consecutive 8-byte aligned sections, given as (typecode, count) pairs, out of a mapped cache
+    @staticmethod
+    def cache_sections(mapped, position, layout):
+        sections = memoryview(mapped)
+        res = []
+        for typecode, count in layout:
+            length = count * array(typecode).itemsize
+            res.append(sections[position:position + length].cast(typecode))
+            position += -(-length // 8) * 8
+        return res
+
+    # Method that loads the heuristic vector from its cache, returns False if there is no fresh cache built for this state space
+    def load_heuristic_cache(self):
+        opened = self.open_cache(self.file_heuristic, HEURISTIC_CACHE_MAGIC, HEURISTIC_CACHE_HEADER)
+        if opened is None:
+            return False
+        mapped, fields = opened
+        if self.digest is None:
+            self.digest = self.file_digest(self.file_statespace)
+        if fields[4] != self.digest or fields[5] != len(self.names):
+            return False
+        body = memoryview(mapped)[HEURISTIC_CACHE_HEADER.size:]
+        self.h = body[:8 * len(self.names)].cast("d")
+        self.h_defined = body[8 * len(self.names):9 * len(self.names)]
+        self.heuristic_cache_map = mapped
+        return True
+
+    # Method that loads the oracle heuristic from its cache, returns False if there is no fresh cache
+    def load_oracle_cache(self):
+        opened = self.open_cache(self.file_statespace, ORACLE_CACHE_MAGIC, ORACLE_CACHE_HEADER, ORACLE_CACHE_SUFFIX)
+        if opened is None:
+            return False
+        mapped, fields = opened
+        if fields[4] != len(self.names):
+            return False
+        self._h_star = memoryview(mapped)[ORACLE_CACHE_HEADER.size:ORACLE_CACHE_HEADER.size + 8 * len(self.names)].cast("d")
+        self.oracle_cache_map = mapped
+        return True
+
+    # Method that writes the binary caches of the state space and heuristic descriptor files
+    # Later runs memory-map these files instead of parsing the descriptors, as long as the descriptors do not change
+    def compile_cache(self):
+        source = os.stat(self.file_statespace)
+        self.digest = self.file_digest(self.file_statespace)
+        names = "\n".join(self.names).encode("utf-8")
+        header = STATESPACE_CACHE_HEADER.pack(STATESPACE_CACHE_MAGIC, source.st_size, source.st_mtime_ns, self.digest,
+                                              len(self.names), len(self.targets), len(self.goal_ids), len(names), self.init_id)
+        sections = [names, array("i", sorted(self.goal_ids)), self.offsets, self.targets, self.costs,
+                    self.transpose_offsets, self.transpose_targets, self.transpose_costs, self.alive()]
+        self.write_cache(self.file_statespace, header, sections)
+        header = ORACLE_CACHE_HEADER.pack(ORACLE_CACHE_MAGIC, source.st_size, source.st_mtime_ns, self.digest, len(self.names))
+        self.write_cache(self.file_statespace, header, [self.oracle_heuristic()], ORACLE_CACHE_SUFFIX)
+        if self.file_heuristic:
+            self.compile_heuristic_cache()
+
+    # Method that writes the binary cache of the currently loaded heuristic descriptor file
+    def compile_heuristic_cache(self):
+        if self.digest is None:
+            self.digest = self.file_digest(self.file_statespace)
+        source = os.stat(self.file_heuristic)
+        header = HEURISTIC_CACHE_HEADER.pack(HEURISTIC_CACHE_MAGIC, source.st_size, source.st_mtime_ns,
+                                             self.file_digest(self.file_heuristic), self.digest, len(self.names))
+        self.write_cache(self.file_heuristic, header, [self.h, self.h_defined])
+
+    # Method that writes a cache file next to its descriptor file - the file is replaced atomically so readers never see a partial cache
+    @staticmethod
+    def write_cache(file_name, header, sections, suffix=".cache"):
+        temporary = StateSpace.cache_path(file_name, suffix) + ".tmp"
+        with open(temporary, "wb") as cache_file:
+            cache_file.write(header)
+            for data in sections:
+                data = memoryview(data).cast("B")
+                cache_file.write(data)
+                cache_file.write(bytes(-len(data) % 8))
+        os.replace(temporary, StateSpace.cache_path(file_name, suffix))
+
+    # Method that groups an edge list by its head states into CSR arrays (offsets, adjacent states, costs)
+    # Counting sort is stable, so edges of a state keep the order they had in the descriptor file
+    @staticmethod
+    def build_csr(size, heads, tails, weights):
+        offsets = array("q", bytes(8 * (size + 1)))
+        for head in heads:
+            offsets[head + 1] += 1
+        for i in range(size):
+            offsets[i + 1] += offsets[i]
+        position = offsets[:-1]
+        adjacent = array("i", bytes(4 * len(tails)))
+        adjacent_costs = array("d", bytes(8 * len(weights)))
+        for head, tail, weight in zip(heads, tails, weights):
+            p = position[head]
+            adjacent[p] = tail
+            adjacent_costs[p] = weight
+            position[head] = p + 1
+        return offsets, adjacent, adjacent_costs
+
+    # Method that returns the outgoing edges of a state as (state ID, cost) pairs
+    def successors(self, state_id):
+        start, end = self.offsets[state_id], self.offsets[state_id + 1]
+        return zip(self.targets[start:end], self.costs[start:end])
+
+    # Method that returns the incoming edges of a state as (state ID, cost) pairs
+    def predecessors(self, state_id):
+        start, end = self.transpose_offsets[state_id], self.transpose_offsets[state_id + 1]
+        return zip(self.transpose_targets[start:end], self.transpose_costs[start:end])
+
+    # Method that rebuilds a dictionary of named transitions from CSR arrays
+    def adjacency_dict(self, offsets, adjacent, adjacent_costs):
+        res = dict()
+        for state_id, name in enumerate(self.names):
+            res[name] = [(self.names[adjacent[i]], adjacent_costs[i]) for i in range(offsets[state_id], offsets[state_id + 1])]
+        return res
+
+    # Dictionary views of the transition relation and its transpose, only built if something asks for them
+    @property
+    def transitions(self):
+        if self._transitions is None:
+            self._transitions = self.adjacency_dict(self.offsets, self.targets, self.costs)
+        return self._transitions
+
+    @property
+    def transpose(self):
+        if self._transpose is None:
+            self._transpose = self.adjacency_dict(self.transpose_offsets, self.transpose_targets, self.transpose_costs)
+        return self._transpose
 
     # Method for reading the next non-comment line of a file
     @staticmethod
@@ -75,140 +859,1405 @@ class StateSpace:
         ret += "Heuristic: {}\n".format(str(self.heuristic))
         return ret
 
-    # Method that implements the BFS strategy - outputs final node and dictionary containing closed nodes
+    # Method that allocates the per-state bookkeeping of a search - cost from the start state, parent ID and closed flag
+    def search_arrays(self):
+        size = len(self.names)
+        return array("d", [inf]) * size, array("i", [-1]) * size, bytearray(size)
+
+    # Method that marks the states that can reach a goal, found by breadth-first search from all goals over the transpose
+    # Computed at most once per state space, and read from the state space cache when there is a fresh one
+    def alive(self):
+        if self._alive is None:
+            offsets, targets = self.transpose_offsets, self.transpose_targets
+            alive = bytearray(len(self.names))
+            opened = deque(self.goal_ids)
+            for goal in self.goal_ids:
+                alive[goal] = 1
+            while opened:
+                state = opened.popleft()
+                for i in range(offsets[state], offsets[state + 1]):
+                    if not alive[targets[i]]:
+                        alive[targets[i]] = 1
+                        opened.append(targets[i])
+            self._alive = alive
+        return self._alive
+
+    # Method that tells whether a goal can be reached from a state, in O(1) once the live states are known
+    # They are only computed for this when dead-end pruning is on, otherwise a search that would find a goal pays nothing
+    def solvable(self, state):
+        if self._alive is None and not self.prune_dead_ends:
+            return True
+        return bool(self.alive()[state])
+
+    # Method that returns the forward CSR arrays with every adjacency list sorted by target name, the order BFS expands in
+    # They are built from the transpose, which lists edges grouped by target - edges to the same target keep their file order
+    def name_graph(self):
+        if self._name_graph is None:
+            heads = self.expand_offsets(self.transpose_offsets)
+            self._name_graph = self.build_csr(len(self.names), self.transpose_targets, heads, self.transpose_costs)
+        return self._name_graph
+
+    # Method that returns the CSR arrays searched by BFS, UCS and A-star, in file order or sorted by name
+    # With dead-end pruning on, these are the transitions without the ones leading to states that cannot reach a goal
+    def search_graph(self, by_name=False):
+        offsets, targets, costs = self.name_graph() if by_name else (self.offsets, self.targets, self.costs)
+        if not self.prune_dead_ends:
+            return offsets, targets, costs
+        if self._live_graph is None:
+            self._live_graph = dict()
+        if by_name not in self._live_graph:
+            alive = self.alive()
+            kept = bytearray(map(alive.__getitem__, targets))
+            live_offsets = array("q", bytes(8 * len(offsets)))
+            for state in range(len(self.names)):
+                live_offsets[state + 1] = live_offsets[state] + kept.count(1, offsets[state], offsets[state + 1])
+            self._live_graph[by_name] = live_offsets, array("i", compress(targets, kept)), array("d", compress(costs, kept))
+        return self._live_graph[by_name]
+
+    # Method that implements the BFS strategy - outputs a SearchResult
+    # A state is recorded the first time it is generated, which is also the entry BFS would expand first
+    @measured_search
     def bfs_traverse(self, begin):
-        opened = Queue()
-        opened.put(Node(False, begin, 0))
-        closed = dict() # Dictionary value is tuple (parent name, node cost) - used in path reconstruction
-        while not opened.empty():
-            n = opened.get()
-            if n.name in closed:
-                continue
-            closed[n.name] = (n.parent_name, n.cost)
-            if n.name in self.goals:
-                return (n, closed)
-            for child in sorted(self.transitions[n.name], key=lambda following: following[0]):
-                if child[0] in closed:
+        offsets, targets, costs = self.search_graph(True)
+        frontier = FifoFrontier()
+        if self.stats is not None:
+            frontier = self.stats.watch(frontier, offsets)
+        push, pop, opened = frontier.push, frontier.pop, frontier.items
+        goals = self.goal_ids
+        g, parent, closed = self.search_arrays()
+        if not self.solvable(begin):
+            return SearchResult(None, 0, g, parent)
+        g[begin] = 0
+        push(begin)
+        visited = 0
+        checkpoint = self.budget.start() if self.budget is not None else 0 # Expansion count at which limits are checked
+        while opened:
+            state = pop()
+            closed[state] = 1
+            visited += 1
+            if state in goals:
+                return SearchResult(state, visited, g, parent)
+            if visited == checkpoint:
+                checkpoint = self.budget.check(visited)
+                if checkpoint is None:
+                    return self.aborted(visited, g, parent)
+            cost = g[state]
+            for i in range(offsets[state], offsets[state + 1]): # Adjacency lists sorted by name
+                child = targets[i]
+                if g[child] != inf:
                     continue
-                opened.put(Node(n, child[0], child[1]))
-        return (False, dict())
+                g[child] = cost + costs[i]
+                parent[child] = state
+                push(child)
+        return SearchResult(None, visited, g, parent)
 
-    # Method that reconstructs the path from closed dictionary, returns the path as a list of node names
+    # Method that reconstructs the path from the parent array, returns the path as a list of state IDs
     @staticmethod
-    def path(curr, closed):
+    def path(curr, parent):
         res = []
         res.append(curr)
-        while closed[curr][0] != "#":
-            res.append(closed[curr][0])
-            curr = closed[curr][0]
+        while parent[curr] != -1:
+            curr = parent[curr]
+            res.append(curr)
         res.reverse()
         return res
 
+    # Method that builds the result of a search stopped by a limit of its budget - outputs a SearchResult without a goal
+    # Searches with a heuristic give it as a function of the state ID, the partial path then leads to the closed state with
+    # the lowest heuristic value, the one that looked closest to a goal
+    def aborted(self, visited, g, parent, f_bound=None, closed=None, h=None):
+        res = SearchResult(None, visited, g, parent)
+        res.aborted = self.budget.reason
+        res.f_bound = f_bound
+        if h is not None:
+            closest = min(compress(range(len(closed)), closed), key=lambda state: (h(state), g[state], state))
+            res.route = self.path(closest, parent)
+        return res
+
+    # Method that returns the cost of a solution with the given path the way the original searches printed it - the integer 0
+    # when the start state is a goal, since their cost only became a float once a transition cost was added to it
+    @staticmethod
+    def path_cost(res, path_res):
+        return res.cost[res.goal] if len(path_res) > 1 else 0
+
     # Method that outputs the result of <algorithm>_traverse methods formatted per the given instructions
+    @timed_phase("output")
     def output(self, res):
-        if not res[0]:
+        if res.aborted is not None:
+            print("[FOUND_SOLUTION]: aborted")
+            print("[ABORT_REASON]: {}".format(res.aborted))
+            print("[STATES_VISITED]: {}".format(res.visited))
+            if res.f_bound is not None:
+                print("[F_BOUND]: {}".format(res.f_bound))
+            if res.route is not None:
+                print("[PARTIAL_PATH]: {}".format(" => ".join(self.names[state_id] for state_id in res.route)))
+            return
+        if res.goal is None:
             print("[FOUND_SOLUTION]: no")
+            if res.peak_frontier is not None:
+                print("[PEAK_FRONTIER]: {}".format(res.peak_frontier))
             return
         print("[FOUND_SOLUTION]: yes")
-        print("[STATES_VISITED]: {}".format(len(res[1])))
-        path_res = self.path(res[0].name, res[1])
+        print("[STATES_VISITED]: {}".format(res.visited))
+        path_res = res.route if res.route is not None else self.path(res.goal, res.parent)
         print("[PATH_LENGTH]: {}".format(len(path_res)))
-        print("[TOTAL_COST]: {}".format(res[0].cost))
-        print("[PATH]: {}".format(" => ".join(path_res)))
+        print("[TOTAL_COST]: {}".format(self.path_cost(res, path_res)))
+        print("[PATH]: {}".format(" => ".join(self.names[state_id] for state_id in path_res)))
+        if res.peak_frontier is not None:
+            print("[PEAK_FRONTIER]: {}".format(res.peak_frontier))
+        if res.bound is not None:
+            print("[SUBOPTIMALITY_BOUND]: {}".format(res.bound))
+
+    # Method that returns the result of <algorithm>_traverse methods as a dictionary, the structured form of output
+    def report(self, res):
+        if res.aborted is not None:
+            ret = {"found": False, "aborted": res.aborted, "visited": res.visited}
+            if res.f_bound is not None:
+                ret["f_bound"] = res.f_bound
+            if res.route is not None:
+                ret["partial_path"] = [self.names[state_id] for state_id in res.route]
+        elif res.goal is None:
+            ret = {"found": False}
+        else:
+            path_res = res.route if res.route is not None else self.path(res.goal, res.parent)
+            ret = {"found": True, "visited": res.visited, "path_length": len(path_res), "cost": self.path_cost(res, path_res),
+                   "path": [self.names[state_id] for state_id in path_res]}
+        if res.peak_frontier is not None:
+            ret["peak_frontier"] = res.peak_frontier
+        if res.bound is not None:
+            ret["bound"] = res.bound
+        return ret
 
     # Wrapper method for outputting BFS results
     def bfs(self):
         print("# BFS")
-        self.output(self.bfs_traverse(self.init))
+        self.output(self.bfs_traverse(self.init_id))
 
-    # Method that implements the UCS strategy - outputs final node and dictionary containing closed nodes
+    # Method that implements the UCS strategy - outputs a SearchResult
+    # The frontier holds (cost, state ID, Link) entries, entries of states that were closed in the meantime are skipped
+    # Every successor that is not closed yet is pushed, like the original search did, so entries with equal cost and state
+    # leave the heap in the same order and a state gets the same parent. Cost and parent are only fixed when it is closed
+    @measured_search
     def ucs_traverse(self, begin):
-        opened = PriorityQueue()
-        opened.put(Node(False, begin, 0))
-        closed = dict() # Dictionary value is tuple (parent name, node cost) - used in path reconstruction
-        while not opened.empty():
-            n = opened.get()
-            if n.name in closed:
+        offsets, targets, costs = self.search_graph()
+        goals = self.goal_ids
+        g, parent, closed = self.search_arrays()
+        frontier = PriorityFrontier()
+        if self.stats is not None:
+            frontier = self.stats.watch(frontier, offsets, closed)
+        push, pop, opened = frontier.push, frontier.pop, frontier.items
+        if not self.solvable(begin):
+            return SearchResult(None, 0, g, parent)
+        push((0, begin, Link(-1, 0)))
+        visited = 0
+        checkpoint = self.budget.start() if self.budget is not None else 0
+        while opened:
+            cost, state, link = pop()
+            if closed[state]:
                 continue
-            closed[n.name] = (n.parent_name, n.cost)
-            if n.name in self.goals:
-                return (n, closed)
-            for child in self.transitions[n.name]:
-                if child[0] in closed:
-                    continue
-                opened.put(Node(n, child[0], child[1]))
-        return (False, dict())
+            closed[state] = 1
+            g[state] = cost
+            parent[state] = link.parent
+            visited += 1
+            if state in goals:
+                return SearchResult(state, visited, g, parent)
+            if visited == checkpoint:
+                checkpoint = self.budget.check(visited)
+                if checkpoint is None:
+                    return self.aborted(visited, g, parent, cost)
+            for i in range(offsets[state], offsets[state + 1]):
+                child = targets[i]
+                if not closed[child]:
+                    push((cost + costs[i], child, Link(state, None)))
+        return SearchResult(None, visited, g, parent)
 
     # Wrapper method for outputting UCS results
     def ucs(self):
         print("# UCS")
-        self.output(self.ucs_traverse(self.init))
+        self.output(self.ucs_traverse(self.init_id))
 
-    # Method that implements the A-star search algorithm - outputs final node and dictionary containing closed nodes
-    def a_star_traverse(self, begin):
-        opened = PriorityQueue()
-        opened.put(Node(False, begin, 0, self.heuristic))
-        closed = dict() # Dictionary value is tuple (parent name, node cost) - used in path reconstruction
-        while not opened.empty():
-            n = opened.get()
-            if n.name in closed:
+    # Method that implements BFS with the frontier and the visited states in temporary files - outputs a SearchResult
+    # Every level is a run in queue order. Its successors are sorted by state with at most half the memory ceiling of records
+    # in memory, the first entry of every state is kept, and states visited before are dropped against the visited runs
+    # (delayed duplicate detection). Sorting the rest by parent rank and transition gives the next level in the order the
+    # one-at-a-time BFS queue would have it, so the report is the same. The path is followed back through the parent ranks.
+    # The limits of the search are checked after every level
+    def external_bfs_traverse(self, begin, memory, directory=None):
+        offsets, targets, costs = self.search_graph(True)
+        goals = self.goal_ids
+        if not self.solvable(begin):
+            return SearchResult(None, 0, {}, None)
+        capacity = max(1, memory // (2 * SPILL_RECORD_MEMORY))
+        with tempfile.TemporaryDirectory(dir=directory) as directory:
+            levels = [SpillRun(directory, SPILL_LEVEL_RECORD, [(begin, -1, 0.0)])]
+            seen = SpillSet(directory)
+            seen.add(SpillRun(directory, SPILL_CANDIDATE_RECORD, [(begin, -1, -1, 0.0)]))
+            visited = 0
+            checkpoint = self.budget.start() if self.budget is not None else inf
+            try:
+                while len(levels[-1]):
+                    level = levels[-1]
+                    for rank, (state, parent_rank, cost) in enumerate(level):
+                        if state in goals:
+                            return self.spilled_route(levels, rank, visited + rank + 1)
+                    if visited >= checkpoint:
+                        checkpoint = self.budget.check(visited)
+                        if checkpoint is None:
+                            return self.aborted(visited, {}, None)
+                    generated = ((targets[i], rank, i, cost + costs[i]) for rank, (state, parent_rank, cost) in enumerate(level)
+                                 for i in range(offsets[state], offsets[state + 1]))
+                    ordered, total = external_sort(generated, SPILL_CANDIDATE_RECORD, capacity, directory)
+                    reached = SpillRun(directory, SPILL_CANDIDATE_RECORD, seen.exclude(first_records(ordered), total))
+                    queued, total = external_sort(((rank, i, state, cost) for state, rank, i, cost in reached),
+                                                  SPILL_QUEUED_RECORD, capacity, directory)
+                    levels.append(SpillRun(directory, SPILL_LEVEL_RECORD, ((state, rank, cost) for rank, i, state, cost in queued)))
+                    seen.add(reached)
+                    visited += len(level)
+                return SearchResult(None, visited, {}, None)
+            finally:
+                for level in levels:
+                    level.remove()
+                seen.remove()
+
+    # Method that follows the parent ranks of the state with the given rank in the last BFS level back to the start state
+    # - outputs a SearchResult with the route
+    @staticmethod
+    def spilled_route(levels, rank, visited):
+        goal, rank, cost = levels[-1].record(rank)
+        route = [goal]
+        for level in reversed(levels[:-1]):
+            state, rank, _ = level.record(rank)
+            route.append(state)
+        route.reverse()
+        return SearchResult(goal, visited, {goal: cost}, None, route)
+
+    # Method that implements UCS with the frontier and the closed states in temporary files - outputs a SearchResult
+    # Frontier entries are added for every generated transition and spilled as sorted runs beyond half the memory ceiling.
+    # Entries are taken out in batches of the costs below the lowest one plus the cheapest transition, which are all final.
+    # A batch is sorted by state, so the first entry of a state has its cost and, among the parents on a shortest path, the one
+    # UCS closes first, by (cost, state ID). States closed before are dropped against the closed runs (delayed duplicate detection).
+    # With positive costs UCS closes states in (cost, state ID) order, so the goal it stops at and the number of states it
+    # visited are known from the batch with the first goal. With free transitions only the cost is sure to be the same.
+    # The limits of the search are checked before every batch
+    def external_ucs_traverse(self, begin, memory, directory=None):
+        offsets, targets, costs = self.search_graph()
+        goals = self.goal_ids
+        if not self.solvable(begin):
+            return SearchResult(None, 0, {}, None)
+        step = min(costs, default=0.0)
+        capacity = max(1, memory // (2 * SPILL_RECORD_MEMORY))
+        with tempfile.TemporaryDirectory(dir=directory) as directory:
+            frontier = SpillQueue(directory, SPILL_FRONTIER_RECORD, capacity)
+            closed = SpillSet(directory)
+            frontier.push((0.0, begin, 0.0, -1))
+            visited = 0
+            checkpoint = self.budget.start() if self.budget is not None else inf
+            try:
+                while frontier:
+                    low = frontier.low()
+                    if visited >= checkpoint:
+                        checkpoint = self.budget.check(visited)
+                        if checkpoint is None:
+                            return self.aborted(visited, {}, None, low)
+                    bound = low + step # Free transitions, or a step too small to change low, take the states at low alone
+                    batch, total = external_sort(((state, cost, parent_cost, parent) for cost, state, parent_cost, parent in frontier.pop_below(bound, bound == low)),
+                                                 SPILL_CLOSED_RECORD, capacity, directory)
+                    batch = SpillRun(directory, SPILL_CLOSED_RECORD, closed.exclude(first_records(batch), total))
+                    reached = [(cost, state) for state, cost, _, _ in batch if state in goals]
+                    if reached:
+                        best = min(reached)
+                        visited += sum(1 for state, cost, _, _ in batch if (cost, state) <= best)
+                        closed.add(batch)
+                        return self.closed_route(closed, best, visited)
+                    for state, cost, _, _ in batch:
+                        for i in range(offsets[state], offsets[state + 1]):
+                            frontier.push((cost + costs[i], targets[i], cost, state))
+                    visited += len(batch)
+                    closed.add(batch)
+                return SearchResult(None, visited, {}, None)
+            finally:
+                frontier.remove()
+                closed.remove()
+
+    # Method that follows the parents of the closed states from the goal back to the start state - outputs a SearchResult
+    # with the route
+    @staticmethod
+    def closed_route(closed, best, visited):
+        cost, goal = best
+        route = [goal]
+        parent = closed.find(goal)[3]
+        while parent != -1:
+            route.append(parent)
+            parent = closed.find(parent)[3]
+        route.reverse()
+        return SearchResult(goal, visited, {goal: cost}, None, route)
+
+    # Wrapper method for outputting the results of BFS or UCS in external memory, with a memory ceiling in bytes
+    def external(self, alg, memory, directory=None):
+        if alg == "bfs":
+            print("# BFS")
+            self.output(self.external_bfs_traverse(self.init_id, memory, directory))
+        else:
+            print("# UCS")
+            self.output(self.external_ucs_traverse(self.init_id, memory, directory))
+
+    # Method that joins the two halves found by a bidirectional search - the forward path from the start state to the meeting
+    # state and the backward chain from the meeting state to a goal - outputs a SearchResult with the whole route
+    # Costs are summed in path order, like in the one-directional searches
+    def join(self, meet, visited, g, parent, following, link):
+        route = self.path(meet, parent)
+        state = meet
+        cost = g[meet]
+        while following[state] != -1:
+            cost += link[state]
+            state = following[state]
+            route.append(state)
+        g[state] = cost
+        return SearchResult(state, visited, g, parent, route)
+
+    # Method that implements bidirectional UCS - outputs a SearchResult
+    # Forward expansion from the start state over the transitions alternates with backward expansion from all goal states
+    # over the transpose. Every time a cost improves on one side, the state is checked as a meeting point against the other side.
+    # The search stops once the two frontier minima add up to at least the cheapest meeting found, which is then optimal
+    def bidirectional_ucs_traverse(self, begin):
+        g, parent, closed = self.search_arrays()
+        g_back, following, closed_back = self.search_arrays()
+        link = array("d", bytes(8 * len(self.names))) # Cost of the edge from a state to the next state towards a goal
+        forward, backward = PriorityFrontier(), PriorityFrontier()
+        g[begin] = 0
+        forward.push((0, begin))
+        for goal in sorted(self.goal_ids): # A sorted list is already a valid heap
+            g_back[goal] = 0
+            backward.items.append((0, goal))
+        best, meet = (0, begin) if begin in self.goal_ids else (inf, None)
+        sides = ((forward, g, parent, closed, g_back, self.offsets, self.targets, self.costs, None),
+                 (backward, g_back, following, closed_back, g, self.transpose_offsets, self.transpose_targets, self.transpose_costs, link))
+        turn = 0
+        visited = 0
+        checkpoint = self.budget.start() if self.budget is not None else inf # Checked before the state is expanded
+        while forward.items and backward.items and forward.items[0][0] + backward.items[0][0] < best:
+            if visited == checkpoint:
+                checkpoint = self.budget.check(visited)
+                if checkpoint is None: # No path is cheaper than the two frontier minima together
+                    return self.aborted(visited, g, parent, forward.items[0][0] + backward.items[0][0])
+            frontier, cost_here, previous, closed_here, cost_there, offsets, targets, costs, links = sides[turn]
+            turn ^= 1
+            cost, state = frontier.pop()
+            if closed_here[state]:
                 continue
-            closed[n.name] = (n.parent_name, n.cost)
-            if n.name in self.goals:
-                return (n, closed)
-            for child in self.transitions[n.name]:
-                child_node = Node(n, child[0], child[1], self.heuristic)
-                if child_node.name in closed:
-                    if closed[child_node.name][1] < child_node.cost:
+            closed_here[state] = 1
+            visited += 1
+            for i in range(offsets[state], offsets[state + 1]):
+                child = targets[i]
+                child_cost = cost + costs[i]
+                if child_cost < cost_here[child]:
+                    cost_here[child] = child_cost
+                    previous[child] = state
+                    if links is not None:
+                        links[child] = costs[i]
+                    frontier.push((child_cost, child))
+                    if child_cost + cost_there[child] < best:
+                        best, meet = child_cost + cost_there[child], child
+        if meet is None:
+            return SearchResult(None, visited, g, parent)
+        return self.join(meet, visited, g, parent, following, link)
+
+    # Wrapper method for outputting bidirectional UCS results
+    def bidirectional_ucs(self):
+        print("# BIDIR-UCS")
+        self.output(self.bidirectional_ucs_traverse(self.init_id))
+
+    # Method that implements bidirectional BFS - outputs a SearchResult
+    # Whole layers are expanded, always on the side with the smaller layer. The first layer that generates states already
+    # seen by the other side yields the meeting points, and the one on the path with the fewest transitions is taken
+    def bidirectional_bfs_traverse(self, begin):
+        g, parent, _ = self.search_arrays()
+        g_back, following, _ = self.search_arrays()
+        link = array("d", bytes(8 * len(self.names)))
+        depth, depth_back = array("i", [-1]) * len(self.names), array("i", [-1]) * len(self.names)
+        g[begin] = 0
+        depth[begin] = 0
+        layer = [begin]
+        layer_back = sorted(self.goal_ids)
+        for goal in layer_back:
+            g_back[goal] = 0
+            depth_back[goal] = 0
+        if begin in self.goal_ids:
+            return self.join(begin, 0, g, parent, following, link)
+        visited = 0
+        checkpoint = self.budget.start() if self.budget is not None else 0
+        while layer and layer_back:
+            if len(layer) <= len(layer_back):
+                cost_here, previous, depth_here, depth_there, links = g, parent, depth, depth_back, None
+                offsets, targets, costs = self.offsets, self.targets, self.costs
+                expanded = layer
+            else:
+                cost_here, previous, depth_here, depth_there, links = g_back, following, depth_back, depth, link
+                offsets, targets, costs = self.transpose_offsets, self.transpose_targets, self.transpose_costs
+                expanded = layer_back
+            generated = []
+            best, meet = inf, None
+            for state in expanded:
+                visited += 1
+                if visited == checkpoint:
+                    checkpoint = self.budget.check(visited)
+                    if checkpoint is None:
+                        return self.aborted(visited, g, parent)
+                for i in range(offsets[state], offsets[state + 1]):
+                    child = targets[i]
+                    if depth_here[child] != -1:
                         continue
-                    else:
-                        closed.pop(child_node.name)
-                opened.put(Node(n, child[0], child[1], self.heuristic))
-        return (False, dict())
-
-    # Wrapper method for outputting A-star results
-    def a_star(self):
-        print("# A-STAR {}".format(self.file_heuristic))
-        self.output(self.a_star_traverse(self.init))
+                    depth_here[child] = depth_here[state] + 1
+                    cost_here[child] = cost_here[state] + costs[i]
+                    previous[child] = state
+                    if links is not None:
+                        links[child] = costs[i]
+                    generated.append(child)
+                    total = depth_here[child] + depth_there[child]
+                    if depth_there[child] != -1 and (total < best or (total == best and child < meet)):
+                        best, meet = total, child
+            if meet is not None:
+                return self.join(meet, visited, g, parent, following, link)
+            if expanded is layer:
+                layer = generated
+            else:
+                layer_back = generated
+        return SearchResult(None, visited, g, parent)
+
+    # Wrapper method for outputting bidirectional BFS results
+    def bidirectional_bfs(self):
+        print("# BIDIR-BFS")
+        self.output(self.bidirectional_bfs_traverse(self.init_id))
+
+    # Method that implements the A-star search algorithm - outputs a SearchResult
+    # As in UCS, the frontier holds (f, state ID, Link) entries for every generated successor, and the cost and parent of a
+    # state are fixed when it is closed. A closed state is reopened when it is reached again by a path that is at most as
+    # expensive, like the original search did - except through a transition of cost 0 from one of its own descendants,
+    # where reopening would close a cycle of parents and the original search never stopped
+    # A weight above 1 inflates the heuristic (weighted A-star), the cost found is then at most weight times the optimal one
+    @measured_search
+    def a_star_traverse(self, begin, weight=1):
+        offsets, targets, costs = self.search_graph()
+        goals, h = self.goal_ids, self.h
+        g, parent, closed = self.search_arrays()
+        frontier = PriorityFrontier()
+        if self.stats is not None:
+            frontier = self.stats.watch(frontier, offsets, closed)
+        push, pop, opened = frontier.push, frontier.pop, frontier.items
+        if not self.solvable(begin):
+            return SearchResult(None, 0, g, parent)
+        push((weight * h[begin], begin, Link(-1, 0))) # States are ordered by the sum of their cost and the value of the heuristic
+        visited, expanded = 0, 0 # Closed states and expansions, which differ once states are reopened
+        checkpoint = self.budget.start() if self.budget is not None else 0
+        while opened:
+            _, state, link = pop()
+            if closed[state]:
+                continue
+            closed[state] = 1
+            g[state] = link.cost
+            parent[state] = link.parent
+            visited += 1
+            expanded += 1
+            if state in goals:
+                return SearchResult(state, visited, g, parent)
+            if expanded == checkpoint:
+                checkpoint = self.budget.check(expanded)
+                if checkpoint is None: # Only unweighted A-star expands states in order of a bound on the solution cost
+                    return self.aborted(visited, g, parent, g[state] + h[state] if weight == 1 else None, closed, h.__getitem__)
+            cost = g[state]
+            for i in range(offsets[state], offsets[state + 1]):
+                child = targets[i]
+                child_cost = cost + costs[i]
+                if closed[child]:
+                    if child_cost > g[child] or (child_cost == cost and self.descends(state, child, parent)):
+                        continue
+                    closed[child] = 0
+                    visited -= 1
+                push((child_cost + weight * h[child], child, Link(state, child_cost)))
+        return SearchResult(None, visited, g, parent)
+
+    # Method that tells whether a state is the given ancestor or descends from it through the parent array
+    @staticmethod
+    def descends(state, ancestor, parent):
+        while state != -1:
+            if state == ancestor:
+                return True
+            state = parent[state]
+        return False
+
+    # Wrapper method for outputting A-star results, from the initial state or from every given start state
+    def a_star(self, starts=None):
+        for start in starts or [None]:
+            print("# A-STAR {}".format(self.file_heuristic))
+            self.output(self.a_star_traverse(self.init_id if start is None else self.ids[start]))
+
+    # Wrapper method for outputting weighted A-star results
+    def weighted_a_star(self, weight):
+        print("# WA-STAR {}".format(self.file_heuristic))
+        res = self.a_star_traverse(self.init_id, weight)
+        res.bound = weight
+        self.output(res)
+
+    # Method that implements HDA-star with the given number of worker processes - outputs a SearchResult and the number of
+    # states every worker expanded. Without fork, workers could not share the parsed state space, so A-star runs instead
+    def hda_star_traverse(self, begin, workers):
+        if "fork" not in multiprocessing.get_all_start_methods():
+            res = self.a_star_traverse(begin)
+            return res, [res.visited]
+        if not self.solvable(begin):
+            return SearchResult(None, 0, {}, None), [0] * workers
+        return HdaStar(self, workers).traverse(begin)
+
+    # Wrapper method for outputting HDA-star results
+    def hda_star(self, workers):
+        print("# HDA-STAR {}".format(self.file_heuristic))
+        res, expansions = self.hda_star_traverse(self.init_id, workers)
+        self.output(res)
+        print("[WORKER_EXPANSIONS]: {}".format(" ".join(map(str, expansions))))
+
+    # Wrapper method for outputting LPA-star results, for the first plan and again after every batch of edits in the file
+    # The planner searches the whole graph, states without a path to a goal may get one through an inserted transition
+    def lpa_star(self, file_edits=None):
+        print("# LPA-STAR {}".format(self.file_heuristic))
+        planner = IncrementalPlanner(self, self.init_id, getattr(self, "h", None))
+        self.output(planner.plan())
+        if file_edits:
+            for batch, (edits, res) in enumerate(planner.replay(file_edits), 1):
+                print("# REPLAN {} ({} edits)".format(batch, edits))
+                self.output(res)
+
+    # Method that implements ARA-star, anytime repairing A-star - yields a SearchResult for every improved solution
+    # The first search is weighted A-star with the given weight, which is then lowered by step after each search until it
+    # reaches 1. Each search reuses the costs found so far: besides the remaining frontier, only the states whose cost
+    # improved after they were expanded (the inconsistent list) are searched again, and a search stops as soon as no frontier
+    # entry can lead to a better solution at the current weight. The bound of a solution is its cost over the smallest g + h
+    # among the frontier and inconsistent states, a lower bound on the optimal cost when the heuristic is consistent.
+    # Parents can improve after a state's cost was recorded, so the reported cost is that of the path, which is never higher
+    def ara_star_traverse(self, begin, weight, step):
+        offsets, targets, costs = self.search_graph()
+        goals, h = self.goal_ids, self.h
+        g, parent, closed = self.search_arrays()
+        if not self.solvable(begin):
+            yield SearchResult(None, 0, g, parent)
+            return
+        opened = bytearray(len(self.names)) # Frontier membership, entries of states that left the frontier are skipped
+        listed = bytearray(len(self.names)) # Membership of the inconsistent list
+        inconsistent = []
+        g[begin] = 0
+        opened[begin] = 1
+        frontier = [(weight * h[begin], begin)]
+        visited = 0
+        checkpoint = self.budget.start() if self.budget is not None else 0
+        reported_cost, reported_bound = inf, inf
+        while True:
+            reached = [goal for goal in goals if g[goal] != inf]
+            best = min(reached, key=lambda goal: g[goal] + weight * h[goal]) if reached else None
+            while frontier:
+                f, state = frontier[0]
+                if not opened[state] or f != g[state] + weight * h[state]: # Left the frontier, or pushed again since
+                    heappop(frontier)
+                    continue
+                if best is not None and g[best] + weight * h[best] <= f:
+                    break
+                heappop(frontier)
+                opened[state] = 0
+                closed[state] = 1
+                visited += 1
+                if visited == checkpoint:
+                    checkpoint = self.budget.check(visited)
+                    if checkpoint is None: # Solutions found so far were already reported with their bounds
+                        yield self.aborted(visited, g, parent)
+                        return
+                cost = g[state]
+                for i in range(offsets[state], offsets[state + 1]):
+                    child = targets[i]
+                    child_cost = cost + costs[i]
+                    if child_cost < g[child]:
+                        g[child] = child_cost
+                        parent[child] = state
+                        if child in goals and (best is None or child_cost + weight * h[child] < g[best] + weight * h[best]):
+                            best = child
+                        if not closed[child]:
+                            opened[child] = 1
+                            heappush(frontier, (child_cost + weight * h[child], child))
+                        elif not listed[child]:
+                            listed[child] = 1
+                            inconsistent.append(child)
+            if best is None:
+                yield SearchResult(None, visited, g, parent)
+                return
+            remaining = set(state for _, state in frontier if opened[state])
+            remaining.update(inconsistent)
+            lower = min((g[state] + h[state] for state in remaining), default=inf)
+            if lower == inf or g[best] <= lower:
+                bound = 1.0
+            else:
+                bound = weight if lower == 0 else min(weight, g[best] / lower)
+            route = self.path(best, parent)
+            cost = sum(min(costs[i] for i in range(offsets[state], offsets[state + 1]) if targets[i] == child)
+                       for state, child in zip(route, route[1:]))
+            if cost < reported_cost or bound < reported_bound:
+                reported_cost, reported_bound = cost, bound
+                yield SearchResult(best, visited, {best: cost}, None, route, bound=bound)
+            if bound <= 1:
+                return
+            weight = max(1.0, weight - step)
+            for state in inconsistent:
+                listed[state] = 0
+            inconsistent = []
+            frontier = [(g[state] + weight * h[state], state) for state in remaining]
+            heapify(frontier)
+            for state in remaining:
+                opened[state] = 1
+            closed = bytearray(len(self.names))
+
+    # Method that implements RTAA-star, real-time adaptive A-star - outputs a SearchResult and the latencies of the steps
+    # In every step the agent looks ahead with A-star from its current state for at most budget expansions, then moves all
+    # the way to the best frontier state. Before it moves, every state expanded in the lookahead has its learned heuristic
+    # value raised to f - g, where f is the f value of that frontier state. Learned values of an optimistic heuristic stay
+    # optimistic, so trials that keep the table converge to optimal paths. With a budget of 1 this is LRTA-star.
+    # The lookahead goes past the budget while its best frontier state is reachable at no cost, since moves that cost nothing
+    # teach nothing and an agent could otherwise circle a zero-cost cycle forever.
+    # The lookahead never enters states without a path to a goal, so the agent cannot get stuck in a dead end and, on a finite
+    # state space, always gets to a goal. The limits of the search are checked over the expansions of all lookaheads.
+    # The path reported is the trajectory of the agent, states it went through several times included
+    def rtaa_star_traverse(self, begin, budget, learned):
+        offsets, targets, costs = self.search_graph()
+        goals = self.goal_ids
+        alive = self.alive()
+        if not alive[begin]:
+            return SearchResult(None, 0, {}, None), []
+        trajectory = [begin]
+        total = 0.0
+        visited = 0
+        latencies = []
+        checkpoint = self.budget.start() if self.budget is not None else 0
+        state = begin
+        while state not in goals:
+            started = time.perf_counter()
+            g, parent = {state: 0}, {state: -1}
+            frontier = [(learned[state], state)]
+            expanded, closed = set(), []
+            target = None
+            while frontier:
+                f, current = frontier[0]
+                if current in expanded or f != g[current] + learned[current]: # Expanded already, or pushed again since
+                    heappop(frontier)
+                    continue
+                if current in goals or (len(closed) >= budget and g[current] > 0):
+                    target = current
+                    break
+                heappop(frontier)
+                expanded.add(current)
+                closed.append(current)
+                visited += 1
+                if visited == checkpoint:
+                    checkpoint = self.budget.check(visited)
+                    if checkpoint is None:
+                        res = SearchResult(None, visited, {}, None, trajectory)
+                        res.aborted = self.budget.reason
+                        return res, latencies
+                for i in range(offsets[current], offsets[current + 1]):
+                    child = targets[i]
+                    if not alive[child]:
+                        continue
+                    child_cost = g[current] + costs[i]
+                    if child_cost < g.get(child, inf):
+                        g[child] = child_cost
+                        parent[child] = current
+                        expanded.discard(child)
+                        heappush(frontier, (child_cost + learned[child], child))
+            best = inf if target is None else g[target] + learned[target]
+            for current in closed:
+                if best - g[current] > learned[current]:
+                    learned[current] = best - g[current]
+            latencies.append(time.perf_counter() - started)
+            if best == inf: # Only a heuristic that rates every state the lookahead got to as unsolvable leaves no way forward
+                return SearchResult(None, visited, {}, None), latencies
+            path = [target]
+            while parent[path[-1]] != -1:
+                path.append(parent[path[-1]])
+            trajectory.extend(reversed(path[:-1]))
+            total += g[target]
+            state = target
+        return SearchResult(state, visited, {state: total}, None, trajectory), latencies
+
+    # Method that returns the table of learned heuristic values that real-time search starts from
+    # It is the heuristic of the state space (all zeros without one), raised to the values stored in the learned heuristic
+    # descriptor file when there is one
+    def learned_heuristic(self, file_learned=None):
+        learned = array("d", self.h) if getattr(self, "h", None) is not None else array("d", bytes(8 * len(self.names)))
+        if file_learned and os.path.exists(file_learned):
+            with open(file_learned, "r") as input_file:
+                for line in input_file:
+                    if line[0] == "#":
+                        continue
+                    pair = line.strip().split(": ")
+                    state_id = self.ids.get(pair[0])
+                    if state_id is not None and float(pair[1]) > learned[state_id]:
+                        learned[state_id] = float(pair[1])
+        return learned
+
+    # Method that writes a table of learned heuristic values as a heuristic descriptor file, usable with --h as well
+    def save_learned(self, file_learned, learned):
+        with open(file_learned + ".tmp", "w") as output_file:
+            output_file.write("# Heuristic learned by real-time search on {}\n".format(self.file_statespace))
+            for name, value in zip(self.names, learned):
+                output_file.write("{}: {}\n".format(name, value))
+        os.replace(file_learned + ".tmp", file_learned)
+
+    # Wrapper method for outputting RTAA-star results with step latency statistics, for a number of trials that share what
+    # they learn. The learned table is stored back to its file afterwards
+    def rtaa_star(self, budget, trials=1, file_learned=None):
+        learned = self.learned_heuristic(file_learned)
+        for _ in range(trials):
+            print("# RTAA-STAR {}".format(self.file_heuristic))
+            res, latencies = self.rtaa_star_traverse(self.init_id, budget, learned)
+            self.output(res)
+            print("[STEPS]: {}".format(len(latencies)))
+            if latencies:
+                latencies.sort()
+                print("[STEP_LATENCY_MS]: mean {:.3f} p50 {:.3f} p95 {:.3f} max {:.3f}".format(
+                    1000 * sum(latencies) / len(latencies), 1000 * latencies[len(latencies) // 2],
+                    1000 * latencies[min(len(latencies) - 1, len(latencies) * 95 // 100)], 1000 * latencies[-1]))
+        if file_learned:
+            self.save_learned(file_learned, learned)
+
+    # Wrapper method for outputting ARA-star results, every improved solution is printed as soon as it is found
+    def ara_star(self, weight, step):
+        print("# ARA-STAR {}".format(self.file_heuristic))
+        for res in self.ara_star_traverse(self.init_id, weight, step):
+            self.output(res)
+            sys.stdout.flush()
     
-    # Dijkstra's algorithim for finding distances from every state to any of the goal nodes
-    def dijkstra(self):
-        distances_final = dict() # Minimal distances from every state to any of the goal states
-        for goal in self.goals:
-            opened = PriorityQueue()
-            processed = set()
-            distances_final[goal] = 0
-            distances = dict() # Minimal distances from every state to current goal node
-            distances[goal] = 0
-            opened.put(Node(False, goal, 0))
-            while not opened.empty():
-                n = opened.get()
-                if n.name in processed:
+    # Method that implements IDA-star - outputs a SearchResult
+    # Iterative deepening over f-cost bounds with an explicit-stack depth-first search, so memory grows with the path length only.
+    # Each iteration keeps a transposition table of the cheapest cost each state was reached with, which prunes cycles and
+    # repeated subtrees. The frontier reported is the longest path the depth-first search had to hold.
+    # The bound of an iteration is a lower bound on the cost of a solution, it is reported when a limit stops the search
+    def ida_star_traverse(self, begin):
+        offsets, targets, costs, goals, h = self.offsets, self.targets, self.costs, self.goal_ids, self.h
+        bound = h[begin]
+        visited = 0
+        peak = 1
+        checkpoint = self.budget.start() if self.budget is not None else 0
+        if begin in goals:
+            g, parent, _ = self.search_arrays()
+            g[begin] = 0
+            return SearchResult(begin, 1, g, parent, peak_frontier=1)
+        while bound != inf:
+            table = array("d", [inf]) * len(self.names)
+            table[begin] = 0
+            route, edges = [begin], [offsets[begin]]
+            visited += 1
+            next_bound = inf # Lowest f that exceeded the current bound
+            while route:
+                if visited == checkpoint:
+                    checkpoint = self.budget.check(visited)
+                    if checkpoint is None:
+                        return self.aborted(visited, None, None, bound)
+                state = route[-1]
+                i = edges[-1]
+                if i == offsets[state + 1]:
+                    route.pop()
+                    edges.pop()
+                    continue
+                edges[-1] = i + 1
+                child = targets[i]
+                child_cost = table[state] + costs[i]
+                if child_cost >= table[child]:
                     continue
-                processed.add(n.name)
-                if not n.name in self.transpose: # Source nodes in the state space graph do not have children in the transpose graph
+                f = child_cost + h[child]
+                if f > bound:
+                    if f < next_bound:
+                        next_bound = f
                     continue
-                for child in self.transpose.get(n.name):
-                    if (not distances.get(child[0])) or distances.get(n.name) + child[1] < distances.get(child[0]):
-                        distances[child[0]] = distances.get(n.name) + child[1]
-                        opened.put(Node(n, child[0], distances[child[0]]-n.cost))
-            for state in distances.keys(): # Updating distances to any goal state if a smaller distance was found for the current goal node
-                if (not state in distances_final) or distances[state] < distances_final[state]:
-                    distances_final[state] = distances[state]
-        return distances_final
+                table[child] = child_cost
+                route.append(child)
+                if len(route) > peak:
+                    peak = len(route)
+                if child in goals:
+                    return SearchResult(child, visited, table, None, route, peak)
+                edges.append(offsets[child])
+                visited += 1
+            bound = next_bound
+        return SearchResult(None, visited, None, None, peak_frontier=peak)
+
+    # Wrapper method for outputting IDA-star results
+    def ida_star(self):
+        print("# IDA-STAR {}".format(self.file_heuristic))
+        self.output(self.ida_star_traverse(self.init_id))
+
+    # Method that implements SMA-star with a budget of at most node_budget search tree nodes in memory - outputs a SearchResult
+    # The frontier node with the lowest f (deepest first) generates its next successor, one at a time, whose f is raised to at
+    # least the f of its parent (pathmax). Once a node has generated all its successors it takes the lowest f of its children
+    # and of the children it forgot, and the change is backed up to its ancestors. When memory is full, the leaf with the
+    # highest f (shallowest first) is dropped and its parent remembers the dropped f. A parent with a finite forgotten f stays
+    # in the frontier, and when it is the best node again it regenerates the successors it no longer holds.
+    # Successors that repeat a state of their own path are not generated, and neither are those whose state is held in memory
+    # at no higher cost and depth - every solution through them is at least as cheap and as short from the held node.
+    # A node as deep as the budget has no room for a successor, so its f becomes inf. The search is optimal unless such a
+    # node was cut off: the cost is then reported with its bound over the lowest f cut off, and when no solution fits in the
+    # budget the search ends as aborted, not with no solution
+    def sma_star_traverse(self, begin, node_budget):
+        offsets, targets, costs, goals, h = self.offsets, self.targets, self.costs, self.goal_ids, self.h
+        best, worst = [], [] # Frontier nodes ordered by (f, deepest, name), leaves ordered by (-f, shallowest)
+        sequence = count()
+        held = dict() # Cheapest, then shallowest, node held in memory for each state
+        used, peak, visited = 0, 0, 0
+        cut = inf # Lowest f of the nodes cut off by the budget, a lower bound on the cost of the solutions through them
+
+        def open_node(node):
+            node.key = next(sequence)
+            heappush(best, (node.f, -node.depth, node.state, node.key, node))
+
+        def mark_leaf(node):
+            node.mark = next(sequence)
+            heappush(worst, (-node.f, node.depth, node.mark, node))
+
+        def generate(parent, state, i, f):
+            nonlocal used, peak, visited, cut
+            node = Node(parent, state, costs[i] if parent else 0, f)
+            node.edge = i
+            node.cursor = offsets[state]
+            if state not in goals and (node.depth >= node_budget - 1 or offsets[state] == offsets[state + 1]):
+                if node.depth >= node_budget - 1:
+                    cut = min(cut, f)
+                node.f = inf
+                node.cursor = offsets[state + 1]
+            else:
+                open_node(node)
+            mark_leaf(node)
+            existing = held.get(state)
+            if existing is None or (node.cost, node.depth) < (existing.cost, existing.depth):
+                held[state] = node
+            used += 1
+            peak = max(peak, used)
+            visited += 1
+            return node
+
+        # Function that gives nodes that generated all their successors the lowest f of their children, from a node up
+        def back_up(node):
+            while node is not None and node.cursor == offsets[node.state + 1]:
+                f = min(min((child.f for child in node.children), default=inf), node.forgotten)
+                if f == node.f:
+                    return
+                node.f = f
+                if node.forgotten < inf:
+                    open_node(node)
+                if not node.children:
+                    mark_leaf(node)
+                node = node.parent
+
+        # Function that drops the worst leaf other than the root and the given node from memory
+        def drop_leaf(keep):
+            nonlocal used
+            skipped = []
+            while worst:
+                entry = heappop(worst)
+                leaf = entry[3]
+                if leaf.mark != entry[2]:
+                    continue
+                if leaf is keep or leaf.parent is None:
+                    skipped.append(entry)
+                    continue
+                leaf.mark = leaf.key = -1
+                if held.get(leaf.state) is leaf:
+                    del held[leaf.state]
+                parent = leaf.parent
+                parent.children.remove(leaf)
+                parent.forgotten = min(parent.forgotten, leaf.f)
+                if parent.cursor == offsets[parent.state + 1] and leaf.f < inf: # Back to the frontier to regenerate it
+                    open_node(parent)
+                if not parent.children:
+                    mark_leaf(parent)
+                used -= 1
+                break
+            for entry in skipped:
+                heappush(worst, entry)
+
+        generate(None, begin, -1, h[begin])
+        checkpoint = self.budget.start() if self.budget is not None else 0
+        while best:
+            f, _, _, key, node = heappop(best)
+            if node.key != key:
+                continue
+            if f == inf: # Every remaining frontier node is out of reach within the memory budget
+                break
+            if visited == checkpoint:
+                checkpoint = self.budget.check(visited)
+                if checkpoint is None: # Every solution goes through a frontier node or one that was cut off
+                    res = self.aborted(visited, None, None, min(f, cut))
+                    res.peak_frontier = peak
+                    return res
+            if node.state in goals:
+                route = []
+                goal = node
+                while node:
+                    route.append(node.state)
+                    node = node.parent
+                route.reverse()
+                res = SearchResult(goal.state, visited, {goal.state: goal.cost}, None, route, peak)
+                if cut < goal.cost:
+                    res.bound = goal.cost / cut if cut > 0 else inf
+                return res
+            end = offsets[node.state + 1]
+            if node.cursor == end: # A node that forgot some of its children starts generating them again
+                node.cursor = offsets[node.state]
+                node.forgotten = inf
+            if used >= node_budget:
+                drop_leaf(node)
+            generated = set(child.edge for child in node.children)
+            i = node.cursor
+            while i < end and (i in generated or self.dominated(held.get(targets[i]), node.cost + costs[i], node.depth + 1)
+                               or self.on_path(node, targets[i])):
+                i += 1
+            node.cursor = min(i + 1, end)
+            if i < end:
+                child = generate(node, targets[i], i, max(node.f, node.cost + costs[i] + h[targets[i]])) # Pathmax keeps f monotone
+                node.children.append(child)
+                node.mark = -1
+            if node.cursor < end:
+                open_node(node)
+            else:
+                node.key = -1
+                back_up(node)
+        res = SearchResult(None, visited, None, None, peak_frontier=peak)
+        if cut < inf:
+            res.aborted = "node_budget"
+            res.f_bound = cut
+        return res
+
+    # Method that tells whether a node held by SMA-star is at least as cheap and as shallow as a successor would be
+    @staticmethod
+    def dominated(existing, cost, depth):
+        return existing is not None and existing.cost <= cost and existing.depth <= depth
+
+    # Method that tells whether a state is held by a search tree node or one of its ancestors
+    @staticmethod
+    def on_path(node, state):
+        while node is not None:
+            if node.state == state:
+                return True
+            node = node.parent
+        return False
+
+    # Wrapper method for outputting SMA-star results
+    def sma_star(self, node_budget):
+        print("# SMA-STAR {}".format(self.file_heuristic))
+        self.output(self.sma_star_traverse(self.init_id, node_budget))
+
+    # Method that gathers the transitions of a whole frontier from CSR arrays - outputs the targets, the costs and the source
+    # of every transition, in frontier order. Rows are cut out as memoryview slices and joined, so no Python code runs per
+    # transition
+    @staticmethod
+    def gather(frontier, offsets, targets, costs):
+        starts = list(map(offsets.__getitem__, frontier))
+        ends = list(map(offsets.__getitem__, map(add, frontier, repeat(1))))
+        rows = list(map(slice, starts, ends))
+        res = []
+        for typecode, column in (("i", targets), ("d", costs)):
+            gathered = array(typecode)
+            gathered.frombytes(b"".join(map(memoryview(column).__getitem__, rows)))
+            res.append(gathered)
+        res.append(array("i", chain.from_iterable(map(repeat, frontier, map(sub, ends, starts)))))
+        return res
+
+    # Method that runs BFS from the given states to the whole state space one level at a time - outputs the cost and parent
+    # arrays, the same as the one-at-a-time BFS queue leaves over the same CSR arrays
+    # The next level is the states of the gathered transitions not seen before, in the order they are first reached, and each
+    # takes the first transition that reached it. That is the order and the parent the BFS queue gives them
+    def level_table(self, sources, offsets, targets, costs):
+        g, parent, seen = self.search_arrays()
+        level = list(dict.fromkeys(sources))
+        for state in level:
+            seen[state] = 1
+            g[state] = 0
+        while level:
+            children, steps, heads = self.gather(level, offsets, targets, costs)
+            first = dict(zip(reversed(children), reversed(range(len(children))))) # Position of the first transition to a state
+            level = sorted(filterfalse(seen.__getitem__, first), key=first.__getitem__)
+            for child in level:
+                i = first[child]
+                seen[child] = 1
+                parent[child] = heads[i]
+                g[child] = g[heads[i]] + steps[i]
+        return g, parent
+
+    # Method that runs delta-stepping from the given states to the whole state space - outputs the cost and parent arrays
+    # States wait in buckets of costs delta wide, the mean transition cost by default. A bucket is relaxed as a whole: the
+    # transitions of all its states are gathered, the ones that do not improve a cost are filtered out in bulk, and the
+    # improved states go to their buckets, possibly the same one again. The costs are the ones of Dijkstra's algorithm, and a
+    # parent only changes when a cost strictly improves, so the parents form a tree of cheapest paths
+    def bucket_table(self, sources, offsets, targets, costs, delta=None):
+        if delta is None:
+            delta = sum(costs) / len(costs) if len(costs) else 0
+        if delta <= 0: # Only free transitions, any width keeps them in one bucket
+            delta = 1.0
+        g, parent, _ = self.search_arrays()
+        for state in sources:
+            g[state] = 0
+        buckets = {0: list(sources)}
+        indices = [0]
+        while indices:
+            index = heappop(indices)
+            while buckets.get(index):
+                # States that moved to a lower bucket since they were put here have been relaxed from there already
+                current = [state for state in dict.fromkeys(buckets.pop(index)) if g[state] // delta == index]
+                children, steps, heads = self.gather(current, offsets, targets, costs)
+                relaxed = list(map(add, map(g.__getitem__, heads), steps))
+                for child, cost, head in compress(zip(children, relaxed, heads), map(lt, relaxed, map(g.__getitem__, children))):
+                    if cost < g[child]: # Not improved more by an earlier transition of the same bucket
+                        g[child] = cost
+                        parent[child] = head
+                        bucket = int(cost // delta)
+                        if bucket not in buckets:
+                            buckets[bucket] = []
+                            if bucket != index:
+                                heappush(indices, bucket)
+                        buckets[bucket].append(child)
+            buckets.pop(index, None)
+        return g, parent
+
+    # Dijkstra's algorithim for finding distances from every state to any of the goal states
+    # All goal states are seeded at distance 0 in a single frontier over the transpose graph
+    # Other source states can be given instead, and forward=True gives distances from the sources rather than to them
+    # Outputs a vector of distances indexed by state ID, states that cannot reach a goal are at distance inf
+    @measured_search
+    def dijkstra(self, sources=None, forward=False):
+        if forward:
+            offsets, targets, costs = self.offsets, self.targets, self.costs
+        else:
+            offsets, targets, costs = self.transpose_offsets, self.transpose_targets, self.transpose_costs
+        distances, _, processed = self.search_arrays()
+        frontier = PriorityFrontier()
+        if self.stats is not None:
+            frontier = self.stats.watch(frontier, offsets, processed)
+        push, pop, opened = frontier.push, frontier.pop, frontier.items
+        for source in sorted(self.goal_ids if sources is None else sources):
+            distances[source] = 0
+            push((0, source))
+        while opened:
+            distance, state = pop()
+            if processed[state]:
+                continue
+            processed[state] = 1
+            for i in range(offsets[state], offsets[state + 1]): # Source nodes in the state space graph do not have children in the transpose graph
+                child = targets[i]
+                child_distance = distance + costs[i]
+                if child_distance < distances[child]:
+                    distances[child] = child_distance
+                    push((child_distance, child))
+        return distances
+
+    # Method that returns the oracle heuristic h* as a vector indexed by state ID
+    # It is computed at most once per state space, and read from the cache written by compile_cache if there is a fresh one
+    def oracle_heuristic(self):
+        if self._h_star is None and not self.load_oracle_cache():
+            self._h_star = self.dijkstra()
+        return self._h_star
+
+    # Method that picks landmark states and computes their distance tables for the ALT heuristic
+    # Landmarks are chosen farthest-first: each one is the state whose distance to or from the closest landmark chosen so far
+    # is the largest, starting from the state with the most transitions (the smallest ID among equals). The choice only
+    # depends on the graph, so the tables serve searches from any start state to any goal. Returns the landmark IDs, the
+    # distances from every landmark to all states and the distances from all states to every landmark
+    def compute_landmarks(self, count):
+        landmarks, from_landmark, to_landmark = array("i"), [], []
+        if not self.names:
+            return landmarks, from_landmark, to_landmark
+        degrees = list(map(add, map(sub, self.offsets[1:], self.offsets[:-1]), map(sub, self.transpose_offsets[1:], self.transpose_offsets[:-1])))
+        hub = degrees.index(max(degrees))
+        separation = array("d", map(min, self.dijkstra([hub], True), self.dijkstra([hub])))
+        while len(landmarks) < count:
+            farthest = max(filter(isfinite, separation), default=0)
+            if farthest == 0: # Every state that can be connected to a landmark already is one
+                break
+            landmark = separation.index(farthest)
+            landmarks.append(landmark)
+            from_landmark.append(self.dijkstra([landmark], True))
+            to_landmark.append(self.dijkstra([landmark]))
+            separation = array("d", map(min, separation, from_landmark[-1], to_landmark[-1]))
+        return landmarks, from_landmark, to_landmark
+
+    # Method that returns the landmark tables for a number of landmarks, read from a fresh cache when there is one
+    # With write=True the tables are computed and written to the cache, so later runs skip the preprocessing. The cache is
+    # keyed on the graph alone, so it stays fresh when only the initial or goal states of the descriptor file change.
+    # Tables once loaded are kept for the state space and its copies
+    def landmarks(self, count, write=False):
+        if count in self._landmarks and not write:
+            return self._landmarks[count]
+        res = None
+        if not write:
+            opened = self.open_cache(self.file_statespace, LANDMARK_CACHE_MAGIC, LANDMARK_CACHE_HEADER, LANDMARK_CACHE_SUFFIX,
+                                     self.graph_digest())
+            if opened is not None and opened[1][4:6] == (len(self.names), count):
+                mapped, fields = opened
+                chosen = fields[6]
+                self.landmark_cache_map = mapped
+                sections = self.cache_sections(mapped, LANDMARK_CACHE_HEADER.size, [("i", chosen)] + [("d", len(self.names))] * (2 * chosen))
+                res = sections[0], sections[1:chosen + 1], sections[chosen + 1:]
+        if res is None:
+            res = self.compute_landmarks(count)
+        if write:
+            source = os.stat(self.file_statespace)
+            landmarks, from_landmark, to_landmark = res
+            # Fewer landmarks than requested are chosen on small graphs, so both counts are stored
+            header = LANDMARK_CACHE_HEADER.pack(LANDMARK_CACHE_MAGIC, source.st_size, source.st_mtime_ns, self.graph_digest(),
+                                                len(self.names), count, len(landmarks))
+            self.write_cache(self.file_statespace, header, [landmarks] + from_landmark + to_landmark, LANDMARK_CACHE_SUFFIX)
+        self._landmarks[count] = res
+        return res
+
+    # Method that switches the state space to the ALT heuristic computed from landmark distance tables
+    # By the triangle inequality d(s, L) - d(t, L) and d(L, t) - d(L, s) are lower bounds on d(s, t) for every landmark L,
+    # so their maximum over landmarks is admissible and consistent towards a goal t, and so is its minimum over all goals
+    # Bounds whose goal term is inf are left out, the remaining inf values only mark states that cannot reach the goal
+    @timed_phase("heuristic_load")
+    def landmark_heuristic(self, count, write=False):
+        landmarks, from_landmark, to_landmark = self.landmarks(count, write)
+        h = array("d", repeat(0.0 if not self.goal_ids else inf, len(self.names)))
+        for goal in sorted(self.goal_ids):
+            bound = array("d", bytes(8 * len(self.names)))
+            for distances in to_landmark:
+                if isfinite(distances[goal]):
+                    bound = array("d", map(max, bound, map(sub, distances, repeat(distances[goal]))))
+            for distances in from_landmark:
+                if isfinite(distances[goal]):
+                    bound = array("d", map(max, bound, map(sub, repeat(distances[goal]), distances)))
+            h = array("d", map(min, h, bound))
+        self.file_heuristic = "landmarks:{}".format(len(landmarks))
+        self.h = h
+        self.h_defined = bytearray(b"\x01") * len(self.names)
+        self._heuristic = None
+        return h
+
+    # Method that builds a contraction hierarchy - outputs the rank of every state and two CSR graphs
+    # States are contracted in order of edge difference (shortcuts added minus edges removed) plus the number of already
+    # contracted neighbours, priorities are only recomputed lazily when a state reaches the top of the queue.
+    # Contracting a state adds a shortcut u -> x for every pair of its edges u -> state -> x unless a witness search from u
+    # that avoids the state finds a path that is at most as cheap. The witness search gives up after witness_limit settled
+    # states, which can only add superfluous shortcuts. The upward graph holds the edges from every state to higher ranked
+    # states, the downward graph holds the edges from higher ranked states stored at their lower ranked target, reversed.
+    # Every edge carries the state it bypasses, or -1 for edges of the state space itself
+    def build_hierarchy(self, witness_limit=64):
+        size = len(self.names)
+        outgoing, incoming = [dict() for _ in range(size)], [dict() for _ in range(size)]
+        for source, target, cost in zip(self.edge_sources(), self.targets, self.costs):
+            if source != target and cost < outgoing[source].get(target, (inf,))[0]: # Parallel edges collapse to the cheapest
+                outgoing[source][target] = incoming[target][source] = (cost, -1)
+        contracted_neighbours = array("i", bytes(4 * size))
+
+        def witness(source, avoided, limit, remaining, settle_limit):
+            distances = {source: 0}
+            opened = [(0, source)]
+            settled = 0
+            while opened and remaining and settled < settle_limit: # Settled targets already have their final distance
+                distance, state = heappop(opened)
+                if distance > limit:
+                    break
+                if distance > distances[state]:
+                    continue
+                settled += 1
+                remaining.discard(state)
+                for child, (cost, _) in outgoing[state].items():
+                    if child != avoided and distance + cost < distances.get(child, inf):
+                        distances[child] = distance + cost
+                        heappush(opened, (distance + cost, child))
+            return distances
+
+        def contraction(state, settle_limit):
+            shortcuts = []
+            for source, (cost, _) in incoming[state].items():
+                candidates = [(target, cost + following) for target, (following, _) in outgoing[state].items() if target != source]
+                if candidates:
+                    distances = witness(source, state, max(candidate for _, candidate in candidates), set(target for target, _ in candidates), settle_limit)
+                    shortcuts.extend((source, target, candidate) for target, candidate in candidates if distances.get(target, inf) > candidate)
+            return len(shortcuts) - len(incoming[state]) - len(outgoing[state]) + contracted_neighbours[state], shortcuts
+
+        estimate_limit = max(1, witness_limit // 8)
+        opened = sorted((contraction(state, estimate_limit)[0], state) for state in range(size)) # A sorted list is already a valid heap
+        rank = array("i", [-1]) * size
+        up, down = (array("i"), array("i"), array("d"), array("i")), (array("i"), array("i"), array("d"), array("i"))
+        order = 0
+        while opened:
+            _, state = heappop(opened)
+            priority = contraction(state, estimate_limit)[0]
+            if opened and priority > opened[0][0]:
+                heappush(opened, (priority, state))
+                continue
+            shortcuts = contraction(state, witness_limit)[1]
+            rank[state] = order
+            order += 1
+            for edges, graph, reverse in ((up, outgoing[state], incoming), (down, incoming[state], outgoing)):
+                for neighbour, (cost, middle) in graph.items():
+                    for column, value in zip(edges, (state, neighbour, cost, middle)):
+                        column.append(value)
+                    del reverse[neighbour][state]
+                    contracted_neighbours[neighbour] += 1
+            for source, target, cost in shortcuts:
+                if cost < outgoing[source].get(target, (inf,))[0]:
+                    outgoing[source][target] = incoming[target][source] = (cost, state)
+            outgoing[state] = incoming[state] = None
+        res = [rank]
+        for heads, tails, costs, middles in (up, down):
+            offsets, targets, edge_costs = self.build_csr(size, heads, tails, costs)
+            res.extend((offsets, targets, edge_costs, self.build_csr(size, heads, middles, costs)[1]))
+        return res
+
+    # Method that returns the contraction hierarchy if it is already known or can be read from a fresh cache, None otherwise
+    def cached_hierarchy(self):
+        if self._hierarchy is None:
+            opened = self.open_cache(self.file_statespace, HIERARCHY_CACHE_MAGIC, HIERARCHY_CACHE_HEADER, HIERARCHY_CACHE_SUFFIX)
+            if opened is not None and opened[1][4] == len(self.names):
+                mapped, fields = opened
+                size, up_edges, down_edges = fields[4:]
+                self.hierarchy_cache_map = mapped
+                self._hierarchy = self.cache_sections(mapped, HIERARCHY_CACHE_HEADER.size,
+                                                      [("i", size), ("q", size + 1), ("i", up_edges), ("d", up_edges), ("i", up_edges),
+                                                       ("q", size + 1), ("i", down_edges), ("d", down_edges), ("i", down_edges)])
+        return self._hierarchy
+
+    # Method that returns the contraction hierarchy, read from a fresh cache when there is one
+    # With write=True the hierarchy is built and written to the cache, so later runs skip the preprocessing
+    def contraction_hierarchy(self, write=False):
+        if not write:
+            self.cached_hierarchy()
+        if self._hierarchy is None:
+            self._hierarchy = self.build_hierarchy()
+            if write:
+                source = os.stat(self.file_statespace)
+                if self.digest is None:
+                    self.digest = self.file_digest(self.file_statespace)
+                header = HIERARCHY_CACHE_HEADER.pack(HIERARCHY_CACHE_MAGIC, source.st_size, source.st_mtime_ns, self.digest,
+                                                     len(self.names), len(self._hierarchy[2]), len(self._hierarchy[6]))
+                self.write_cache(self.file_statespace, header, self._hierarchy, HIERARCHY_CACHE_SUFFIX)
+        return self._hierarchy
+
+    # Method that finds the state bypassed by the hierarchy edge stored at state that leads to (or comes from) other
+    @staticmethod
+    def bypassed(offsets, targets, middles, state, other):
+        for i in range(offsets[state], offsets[state + 1]):
+            if targets[i] == other:
+                return middles[i]
+
+    # Method that replaces a hierarchy edge by the transitions it stands for - outputs the states after source up to target
+    def unpack(self, source, target, middle):
+        _, up_offsets, up_targets, _, up_middles, down_offsets, down_targets, _, down_middles = self.contraction_hierarchy()
+        res = []
+        stack = [(source, target, middle)]
+        while stack:
+            source, target, middle = stack.pop()
+            if middle == -1:
+                res.append(target)
+                continue
+            # The bypassed state is ranked below both ends, so the second half is an upward edge and the first a downward one
+            stack.append((middle, target, self.bypassed(up_offsets, up_targets, up_middles, middle, target)))
+            stack.append((source, middle, self.bypassed(down_offsets, down_targets, down_middles, middle, source)))
+        return res
+
+    # Method that answers a query over the contraction hierarchy - outputs a SearchResult
+    # Forward search from the start state over upward edges alternates with backward search from all goal states over the
+    # reversed downward edges, so both only climb in rank. A side stops once its frontier minimum reaches the cheapest
+    # meeting found, then the edges on both halves of the path are unpacked into transitions of the state space.
+    # Queries touch few states, so their bookkeeping is kept in dictionaries instead of arrays over all states
+    def ch_traverse(self, begin):
+        _, up_offsets, up_targets, up_costs, up_middles, down_offsets, down_targets, down_costs, down_middles = self.contraction_hierarchy()
+        g, parent, closed = {begin: 0}, {begin: None}, set()
+        g_back, following, closed_back = dict(), dict(), set()
+        forward, backward = [(0, begin)], []
+        for goal in sorted(self.goal_ids): # A sorted list is already a valid heap
+            g_back[goal] = 0
+            following[goal] = None
+            backward.append((0, goal))
+        best, meet = (0, begin) if begin in self.goal_ids else (inf, None)
+        sides = ((forward, g, parent, closed, g_back, up_offsets, up_targets, up_costs, up_middles),
+                 (backward, g_back, following, closed_back, g, down_offsets, down_targets, down_costs, down_middles))
+        turn = 0
+        visited = 0
+        checkpoint = self.budget.start() if self.budget is not None else 0
+        while (forward and forward[0][0] < best) or (backward and backward[0][0] < best):
+            frontier, cost_here, previous, closed_here, cost_there, offsets, targets, costs, middles = sides[turn]
+            turn ^= 1
+            if not frontier or frontier[0][0] >= best:
+                continue
+            cost, state = heappop(frontier)
+            if state in closed_here:
+                continue
+            closed_here.add(state)
+            visited += 1
+            if visited == checkpoint:
+                checkpoint = self.budget.check(visited)
+                if checkpoint is None:
+                    return self.aborted(visited, g, parent)
+            for i in range(offsets[state], offsets[state + 1]):
+                child = targets[i]
+                child_cost = cost + costs[i]
+                if child_cost < cost_here.get(child, inf):
+                    cost_here[child] = child_cost
+                    previous[child] = (state, middles[i])
+                    heappush(frontier, (child_cost, child))
+                    if child_cost + cost_there.get(child, inf) < best:
+                        best, meet = child_cost + cost_there[child], child
+        if meet is None:
+            return SearchResult(None, visited, g, parent)
+        edges = []
+        state = meet
+        while parent[state] is not None:
+            edges.append((parent[state][0], state, parent[state][1]))
+            state = parent[state][0]
+        route = [begin]
+        for source, target, middle in reversed(edges):
+            route.extend(self.unpack(source, target, middle))
+        state = meet
+        while following[state] is not None:
+            route.extend(self.unpack(state, *following[state]))
+            state = following[state][0]
+        return SearchResult(state, visited, {state: best}, None, route)
+
+    # Wrapper method for outputting contraction hierarchy query results, one per start state
+    def ch(self, starts=None):
+        for start in starts or [self.init]:
+            print("# CH")
+            self.output(self.ch_traverse(self.ids[start]))
+
+    # Method that lists the source state ID of every forward edge, aligned with the targets and costs arrays
+    def edge_sources(self):
+        if self._edge_sources is None:
+            self._edge_sources = self.expand_offsets(self.offsets)
+        return self._edge_sources
+
+    # Method that repeats each state ID once per entry of its CSR row
+    @staticmethod
+    def expand_offsets(offsets):
+        res = array("i")
+        for state_id in range(len(offsets) - 1):
+            res.extend(repeat(state_id, offsets[state_id + 1] - offsets[state_id]))
+        return res
+
+    # Method that prints the per-condition lines of a heuristic check, or only the number of failed conditions in summary mode
+    @staticmethod
+    def report_conditions(template, conditions, columns, summary):
+        if summary:
+            print("[FAILED_CONDITIONS]: {}".format(conditions.count(False)))
+        elif conditions:
+            print("\n".join(map(template.format, map(("[ERR]", "[OK]").__getitem__, conditions), *columns)))
 
     # Method for determining whether the given heuristic is optimistic or not
-    def determine_optimism(self):
+    # The whole condition vector h(s) <= h*(s) is evaluated at once, only the report is formatted state by state
+    def determine_optimism(self, summary=False):
         if not self.file_heuristic:
             print("# HEURISTIC-OPTIMISTIC HEURISTIC NOT DEFINED")
             return
         print("# HEURISTIC-OPTIMISTIC {}".format(self.file_heuristic))
-        conclusion = True
-        h_star = self.dijkstra() # We use the modified Dijkstra's algorithm implemented above to compute the oracle heuristic
-        for state in sorted(self.heuristic.keys()):
-            res = self.heuristic[state] <= h_star[state]
-            conclusion = conclusion and res
-            print("[CONDITION]: {} h({}) <= h*: {} <= {}".format('[OK]' if res else '[ERR]', state, self.heuristic[state], float(h_star[state])))
+        h_star = self.oracle_heuristic() # We use the multi-source Dijkstra's algorithm implemented above to compute the oracle heuristic
+        states = list(compress(range(len(self.names)), self.h_defined)) # State IDs follow name order, so states are sorted by name
+        h_values = list(map(self.h.__getitem__, states))
+        h_star_values = list(map(h_star.__getitem__, states))
+        conditions = list(map(le, h_values, h_star_values))
+        conclusion = all(conditions)
+        self.report_conditions("[CONDITION]: {} h({}) <= h*: {} <= {}", conditions,
+                               (map(self.names.__getitem__, states), h_values, h_star_values), summary)
         if conclusion:
             print("[CONCLUSION]: Heuristic is optimistic.")
         else:
@@ -216,20 +2265,20 @@ class StateSpace:
         return conclusion
 
     # Method for determining whether the given heuristic is consistent or not
-    def determine_consistency(self):
+    # The whole condition vector h(s1) <= h(s2) + c is evaluated at once over the edge arrays, only the report is formatted edge by edge
+    def determine_consistency(self, summary=False):
         if not self.file_heuristic:
             print("# HEURISTIC-CONSISTENT HEURISTIC NOT DEFINED")
             return
         print("# HEURISTIC-CONSISTENT {}".format(self.file_heuristic))
-        conclusion = True
-        for transitionset in sorted(self.transitions.items()):
-            state1 = transitionset[0]
-            for transition in sorted(transitionset[1]):
-                cost = transition[1]
-                state2 = transition[0]
-                res = self.heuristic[state1] <= (self.heuristic[state2] + cost)
-                conclusion = conclusion and res
-                print("[CONDITION]: {} h({}) <= h({}) + c: {} <= {} + {}".format('[OK]' if res else '[ERR]',state1, state2, self.heuristic[state1], self.heuristic[state2], cost))
+        _, targets, costs = self.name_graph() # Edges are grouped by source and sorted by target, so they are reported sorted by name
+        sources = self.edge_sources() # Rows have the same lengths in both orders
+        h_sources = list(map(self.h.__getitem__, sources))
+        h_targets = list(map(self.h.__getitem__, targets))
+        conditions = list(map(le, h_sources, map(add, h_targets, costs)))
+        conclusion = all(conditions)
+        self.report_conditions("[CONDITION]: {} h({}) <= h({}) + c: {} <= {} + {}", conditions,
+                               (map(self.names.__getitem__, sources), map(self.names.__getitem__, targets), h_sources, h_targets, costs), summary)
         if conclusion:
             print("[CONCLUSION]: Heuristic is consistent.")
         else:
@@ -237,32 +2286,1085 @@ class StateSpace:
         return conclusion
 
 
+
+# Class that models a state space given implicitly by a domain plugin instead of a descriptor file
+# The domain provides initial_state(), is_goal(state) and successors(state), which yields (state, cost) pairs, and optionally
+# heuristic(state) and name(state) - names default to str(state) and have to be unique. States are interned to integer IDs
+# as the searches generate them, so nothing is enumerated up front. The heuristic is memoized in an LRU cache
+class ImplicitStateSpace(StateSpace):
+    def __init__(self, domain, description, file_heuristic="", heuristic_cache_size=2 ** 20):
+        self.domain = domain
+        self.file_statespace = description
+        self.file_heuristic = ""
+        self.clear_derived()
+        self._materialized = None
+        self.heuristic_cache_size = heuristic_cache_size
+        self.name = getattr(domain, "name", str)
+        self.states = [] # State objects indexed by state ID
+        self.names = []
+        self.ids = dict()
+        self.init_id = self.intern(domain.initial_state())
+        self.init = self.names[self.init_id]
+        self.h_function = None
+        if file_heuristic:
+            self.load_heuristic(file_heuristic)
+        elif hasattr(domain, "heuristic"):
+            self.file_heuristic = "{}.heuristic".format(description)
+            self.h_function = lru_cache(maxsize=heuristic_cache_size)(domain.heuristic)
+
+    # String represantation of a state space - for use in testing
+    def __str__(self):
+        ret = "Domain: {}\n\n".format(self.file_statespace)
+        ret += "Initial state: {}\n\n".format(self.init)
+        ret += "Generated states: {}\n".format(len(self.states))
+        return ret
+
+    # Method that switches to a heuristic descriptor file, whose values are looked up by state name (0 for missing states)
+    def load_heuristic(self, file_heuristic, use_cache=True):
+        self.file_heuristic = file_heuristic
+        values = dict()
+        with open(file_heuristic, "r") as input_file:
+            for line in input_file:
+                if line[0] == "#":
+                    continue
+                pair = line.strip().split(": ")
+                values[pair[0]] = float(pair[1])
+        self.h_function = lru_cache(maxsize=self.heuristic_cache_size)(lambda state: values.get(self.name(state), 0.0))
+
+    # Method that returns the ID of a state, interning the state if it was not generated before
+    def intern(self, state):
+        state_id = self.ids.get(state)
+        if state_id is None:
+            state_id = self.ids[state] = len(self.states)
+            self.states.append(state)
+            self.names.append(self.name(state))
+        return state_id
+
+    # Method that generates the successors of a state as (state ID, cost) pairs
+    # The bookkeeping arrays of the running search are extended to cover newly interned states
+    def expand(self, state_id, arrays):
+        res = [(self.intern(child), cost) for child, cost in self.domain.successors(self.states[state_id])]
+        missing = len(self.states) - len(arrays[0])
+        if missing > 0:
+            g, parent, closed = arrays
+            g.extend(repeat(inf, missing))
+            parent.extend(repeat(-1, missing))
+            closed.extend(bytes(missing))
+        return res
+
+    # Method that implements the BFS strategy over generated states - outputs a SearchResult
+    def bfs_traverse(self, begin):
+        g, parent, closed = arrays = self.search_arrays()
+        is_goal, states, names = self.domain.is_goal, self.states, self.names
+        g[begin] = 0
+        opened = deque([begin])
+        visited = 0
+        checkpoint = self.budget.start() if self.budget is not None else 0
+        while opened:
+            state = opened.popleft()
+            closed[state] = 1
+            visited += 1
+            if is_goal(states[state]):
+                return SearchResult(state, visited, g, parent)
+            if visited == checkpoint:
+                checkpoint = self.budget.check(visited)
+                if checkpoint is None:
+                    return self.aborted(visited, g, parent)
+            cost = g[state]
+            for child, step in sorted(self.expand(state, arrays), key=lambda following: names[following[0]]):
+                if g[child] != inf:
+                    continue
+                g[child] = cost + step
+                parent[child] = state
+                opened.append(child)
+        return SearchResult(None, visited, g, parent)
+
+    # Method that implements the UCS strategy over generated states - outputs a SearchResult
+    # State IDs follow generation order here, so frontier entries carry the state name to break ties by name
+    def ucs_traverse(self, begin):
+        return self.best_first_traverse(begin, None)
+
+    # Method that implements the A-star search algorithm over generated states - outputs a SearchResult
+    def a_star_traverse(self, begin):
+        return self.best_first_traverse(begin, self.h_function)
+
+    # Method shared by UCS (no heuristic) and A-star, frontier entries are (f, state name, state ID)
+    # A closed state is reopened only when it is reached by a strictly cheaper path
+    def best_first_traverse(self, begin, h):
+        g, parent, closed = arrays = self.search_arrays()
+        is_goal, states, names = self.domain.is_goal, self.states, self.names
+        g[begin] = 0
+        opened = [(h(states[begin]) if h else 0, names[begin], begin)]
+        visited, expanded = 0, 0
+        checkpoint = self.budget.start() if self.budget is not None else 0
+        while opened:
+            f, _, state = heappop(opened)
+            if closed[state]:
+                continue
+            closed[state] = 1
+            visited += 1
+            expanded += 1
+            if is_goal(states[state]):
+                return SearchResult(state, visited, g, parent)
+            if expanded == checkpoint:
+                checkpoint = self.budget.check(expanded)
+                if checkpoint is None:
+                    return self.aborted(visited, g, parent, f, closed, (lambda state: h(states[state])) if h else None)
+            cost = g[state]
+            for child, step in self.expand(state, arrays):
+                child_cost = cost + step
+                if child_cost < g[child]:
+                    if closed[child]:
+                        closed[child] = 0
+                        visited -= 1
+                    g[child] = child_cost
+                    parent[child] = state
+                    heappush(opened, (child_cost + h(states[child]) if h else child_cost, names[child], child))
+        return SearchResult(None, visited, g, parent)
+
+    # Method that enumerates every state reachable from the initial state into an explicit StateSpace
+    # Only the heuristic checks need the whole space, so this happens when one of them runs and the graph is kept afterwards
+    # The heuristic vector is refreshed on every call, since the heuristic may have been switched in the meantime
+    def materialize(self):
+        if self._materialized is None:
+            sources, targets, costs = array("i"), array("i"), array("d")
+            seen = bytearray(len(self.states))
+            seen[self.init_id] = 1
+            opened = deque([self.init_id])
+            while opened:
+                state = opened.popleft()
+                for child, cost in self.domain.successors(self.states[state]):
+                    child = self.intern(child)
+                    sources.append(state)
+                    targets.append(child)
+                    costs.append(cost)
+                    if child >= len(seen):
+                        seen.extend(bytes(child + 1 - len(seen)))
+                    if not seen[child]:
+                        seen[child] = 1
+                        opened.append(child)
+            goals = [self.names[state] for state in range(len(self.states)) if self.domain.is_goal(self.states[state])]
+            self._materialized = StateSpace.from_edges(self.file_statespace, self.init, goals, list(self.names), sources, targets, costs)
+        space = self._materialized
+        space.file_heuristic = self.file_heuristic
+        if self.h_function:
+            by_name = dict(zip(self.names, self.states))
+            space.h = array("d", (self.h_function(by_name[name]) for name in space.names))
+            space.h_defined = bytearray(b"\x01") * len(space.names)
+            space._heuristic = None
+        return space
+
+    # Method for determining whether the heuristic is optimistic or not, over all reachable states
+    def determine_optimism(self, summary=False):
+        return self.materialize().determine_optimism(summary)
+
+    # Method for determining whether the heuristic is consistent or not, over all reachable transitions
+    def determine_consistency(self, summary=False):
+        return self.materialize().determine_consistency(summary)
+
+
+# Function that loads a domain plugin given as "module", "module:Class", "path/to/file.py" or "path/to/file.py:Class"
+# A class is instantiated with the given arguments, name=value arguments are passed by keyword. A module provides the
+# domain functions itself
+def load_domain(spec, arguments=()):
+    location, attribute = spec, ""
+    if not spec.endswith(".py") and ":" in spec:
+        location, _, attribute = spec.rpartition(":")
+    if location.endswith(".py"):
+        module_spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(location))[0], location)
+        module = importlib.util.module_from_spec(module_spec)
+        module_spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(location)
+    if not attribute:
+        return module
+    domain = getattr(module, attribute)
+    if not isinstance(domain, type):
+        return domain
+    keywords = dict(argument.split("=", 1) for argument in arguments if "=" in argument)
+    return domain(*[argument for argument in arguments if "=" not in argument], **keywords)
+
+# Class that writes through to a stream while keeping a copy of everything written, for recording reports of runs
+class TeeOutput(io.StringIO):
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = stream
+
+    def write(self, text):
+        self.stream.write(text)
+        return super().write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+# Class that stores the reports of earlier runs in a SQLite database, keyed by a digest of everything a report depends on
+# Once the stored reports grow past max_bytes, the least recently used ones are evicted
+class ResultCache:
+    def __init__(self, file_name, max_bytes):
+        directory = os.path.dirname(file_name)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(file_name)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, report TEXT, size INTEGER, used INTEGER)")
+        self.max_bytes = max_bytes
+
+    # Method that returns the stored report for a key or None, and marks it as used
+    def get(self, key):
+        row = self.connection.execute("SELECT report FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with self.connection:
+            self.connection.execute("UPDATE results SET used = ? WHERE key = ?", (time.time_ns(), key))
+        return row[0]
+
+    # Method that stores a report, then evicts least recently used reports until the total size is within the bound
+    # Reports larger than the bound are not stored at all, they would only evict everything else
+    def put(self, key, report):
+        if len(report) > self.max_bytes:
+            return
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)", (key, report, len(report), time.time_ns()))
+            total = self.connection.execute("SELECT SUM(size) FROM results").fetchone()[0]
+            for old_key, size in self.connection.execute("SELECT key, size FROM results ORDER BY used").fetchall():
+                if total <= self.max_bytes:
+                    break
+                self.connection.execute("DELETE FROM results WHERE key = ?", (old_key,))
+                total -= size
+
+    # Method that builds the key of a run from the contents of this program and the descriptor files, the heuristic file
+    # names (they appear in the report) and every option that changes the report
+    @staticmethod
+    def key(args, heuristics):
+        options = sorted((name, value) for name, value in vars(args).items() if name not in RESULT_CACHE_IGNORED)
+        files = [StateSpace.file_digest(os.path.abspath(__file__)).hex(), StateSpace.file_digest(args.ss).hex()]
+        files.extend((file_heuristic, StateSpace.file_digest(file_heuristic).hex()) for file_heuristic in heuristics)
+        if args.edits is not None:
+            files.append((args.edits, StateSpace.file_digest(args.edits).hex()))
+        return hashlib.sha256(repr((files, options)).encode("utf-8")).hexdigest()
+
+
+# Class that answers JSON-lines search requests against state spaces and heuristics that are loaded once
+# A request is an object with the algorithm "alg" and optionally an "id" echoed in the response, the state space "ss" and
+# heuristic "h" (file or base name, needed when several are loaded), a "start" state, a list of "goals" replacing the goal
+# states, a "node_budget" for SMA-star, a weight "w" for weighted A-star and the number of "landmarks" for A-star with the
+# ALT heuristic ("alt"). Every response is one line holding either the result or an "error"
+class SearchServer:
+    def __init__(self, spaces, heuristics, node_budget, limits=(None, None, None), landmark_count=ALT_LANDMARKS):
+        self.spaces = dict()
+        self.variants = dict() # State space file -> copies of the state space with one of the heuristics loaded, by name
+        self.node_budget = node_budget
+        self.limits = limits # Default expansion, time and memory limits of requests
+        self.landmark_count = landmark_count # Number of landmarks of alt requests that do not give one
+        self.preprocessing_lock = threading.Lock() # Held while the first request that needs them builds preprocessed tables
+        for space in spaces:
+            # A fresh compiled contraction hierarchy is mapped before any copy is made, so every copy shares it. Building one
+            # can take long on large state spaces, so it is left to the first ch request
+            space.cached_hierarchy()
+            self.spaces[space.file_statespace] = self.spaces[os.path.basename(space.file_statespace)] = space
+            variants = self.variants[space.file_statespace] = dict()
+            for file_heuristic in heuristics:
+                variant = copy.copy(space) # The graph arrays are shared, only the heuristic vector is per copy
+                variant.load_heuristic(file_heuristic)
+                if any(variant.h_defined): # Heuristics that name none of the states belong to other state spaces
+                    variants[file_heuristic] = variants[os.path.basename(file_heuristic)] = variant
+
+    # Method that finds a loaded object by name, the name can be left out when only one is loaded
+    @staticmethod
+    def lookup(loaded, name, kind):
+        if name is None:
+            if len(set(map(id, loaded.values()))) != 1:
+                raise ValueError("{} has to be named, {} are loaded".format(kind, len(set(map(id, loaded.values())))))
+            return next(iter(loaded.values()))
+        if name not in loaded:
+            raise ValueError("unknown {} {}".format(kind, name))
+        return loaded[name]
+
+    # Method that returns the ID of a state named in a request
+    @staticmethod
+    def state_id(space, name):
+        if name not in space.ids:
+            raise ValueError("unknown state {}".format(name))
+        return space.ids[name]
+
+    # Method that runs one request - outputs the structured result
+    # Every request searches its own shallow copy of the state space, so goal overrides never leak into other requests
+    # The copy shares the graph and the contraction hierarchy, only the goal dependent tables are reset when goals are given.
+    # The first ch request on a state space builds its hierarchy on the loaded state space, so later requests share it, and so
+    # do alt requests with the landmark tables. With worker processes every worker builds its own, compiling the caches first
+    # spares them that. The ALT heuristic itself depends on the goals, so it is computed for every alt request
+    def search(self, request):
+        alg = request.get("alg")
+        if alg not in SERVE_ALGORITHMS:
+            raise ValueError("unknown algorithm {}".format(alg))
+        weight = float(request.get("w", 2.0))
+        if alg == "wastar" and not weight >= 1: # Like --w, lower weights would give a bound below the optimal cost
+            raise ValueError("w has to be at least 1")
+        space = self.lookup(self.spaces, request.get("ss"), "state space")
+        if alg == "ch" and space.cached_hierarchy() is None:
+            with self.preprocessing_lock:
+                space.contraction_hierarchy()
+        if alg == "alt":
+            landmark_count = int(request.get("landmarks", self.landmark_count))
+            if landmark_count < 1:
+                raise ValueError("landmarks has to be positive")
+            with self.preprocessing_lock:
+                space.landmarks(landmark_count)
+        if alg in SERVE_HEURISTIC_ALGORITHMS:
+            space = self.lookup(self.variants[space.file_statespace], request.get("h"), "heuristic")
+        space = copy.copy(space)
+        if "goals" in request:
+            space.goal_ids = set(self.state_id(space, goal) for goal in request["goals"])
+            space.goals = set(request["goals"])
+            space._alive = space._live_graph = space._h_star = None # These depend on the goal states
+        begin = self.state_id(space, request.get("start", space.init))
+        if alg == "alt":
+            space.landmark_heuristic(landmark_count)
+        limits = [request.get(name, default) for name, default in zip(("max_expansions", "max_seconds", "max_memory_mb"), self.limits)]
+        if any(limit is not None for limit in limits):
+            expansions, seconds, memory_mb = limits
+            space.budget = SearchBudget(None if expansions is None else int(expansions), seconds, memory_mb)
+        traverse = getattr(space, SERVE_ALGORITHMS[alg])
+        if alg == "smastar":
+            res = traverse(begin, int(request.get("node_budget", self.node_budget)))
+        elif alg == "wastar":
+            res = traverse(begin, weight)
+            res.bound = weight
+        else:
+            res = traverse(begin)
+        return space.report(res)
+
+    # Method that answers one request line - outputs the response line
+    def answer(self, line):
+        response = {"id": None}
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("a request has to be a JSON object")
+            response["id"] = request.get("id")
+            response.update(self.search(request))
+        except Exception as error: # A bad request must not bring the server down
+            response["error"] = "{}: {}".format(type(error).__name__, error)
+        return json.dumps(response)
+
+    # Method that answers the request lines of a stream, in the worker pool when there is one
+    # Responses are written as soon as they are ready, so with a pool they can come back in a different order than requests
+    def serve_stream(self, lines, output, pool):
+        lock = threading.Lock()
+        def write(response):
+            with lock:
+                output.write(response + "\n")
+                output.flush()
+        pending = []
+        for line in lines:
+            if not line.strip():
+                continue
+            if pool is None:
+                write(self.answer(line))
+                continue
+            pending.append(pool.apply_async(serve_worker, (line,), callback=write))
+            if len(pending) > 1024:
+                pending = [result for result in pending if not result.ready()]
+        for result in pending:
+            result.wait()
+
+    # Method that serves requests from standard input, or from connections to a Unix socket when its path is given
+    # Loaded state spaces are shared with the worker processes by forking them after loading. SIGTERM stops the server
+    # like an interrupt does, so the socket file is removed and the workers are shut down
+    def serve(self, address, jobs):
+        global SERVER
+        SERVER = self
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        pool = None
+        if jobs > 1 and "fork" in multiprocessing.get_all_start_methods():
+            pool = multiprocessing.get_context("fork").Pool(jobs)
+        try:
+            if address == "-":
+                self.serve_stream(sys.stdin, sys.stdout, pool)
+                return
+            if os.path.exists(address) and stat.S_ISSOCK(os.stat(address).st_mode): # Left behind by a server that was killed
+                os.unlink(address)
+            with socketserver.ThreadingUnixStreamServer(address, SearchRequestHandler) as server:
+                server.daemon_threads = True
+                server.pool = pool
+                try:
+                    server.serve_forever()
+                finally:
+                    os.unlink(address)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+
+# Class that handles one connection to the serve mode socket, every connection is served by its own thread
+class SearchRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        output = io.TextIOWrapper(self.wfile, encoding="utf-8", write_through=True)
+        try:
+            SERVER.serve_stream(io.TextIOWrapper(self.rfile, encoding="utf-8"), output, self.server.pool)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+# Server shared with the worker processes of serve mode
+SERVER = None
+
+# Function executed by the worker processes of serve mode, returns the response line for a request line
+def serve_worker(line):
+    return SERVER.answer(line)
+
+
+# Class that runs hash-distributed A-star (HDA-star) on forked worker processes
+# Every state is owned by one worker, chosen by a multiplicative hash of its ID. A worker keeps the costs, parents and
+# frontier of the states it owns, and sends the successors it generates for other workers in batches through their queues.
+# Goals update a shared incumbent cost, and successors that cannot beat it are dropped. A worker whose frontier has nothing
+# below the incumbent left marks itself idle. Batches sent and received are counted under the same lock as the idle flags,
+# and the search ends once all workers are idle with no batch in flight - with an optimistic heuristic the incumbent is then
+# optimal. States are reopened when they are reached by a cheaper path, since workers expand in parallel out of f order
+class HdaStar:
+    def __init__(self, problem, workers):
+        context = multiprocessing.get_context("fork")
+        self.context = context
+        self.problem = problem
+        self.workers = workers
+        self.lock = context.Lock()
+        self.batches = context.Array("q", 2, lock=False) # Batches sent and received
+        self.idle = context.Array("b", workers, lock=False)
+        self.incumbent = context.Array("d", [inf], lock=False)
+        self.goal = context.Array("i", [-1], lock=False)
+        self.done = context.Event()
+        self.inboxes = [context.Queue() for _ in range(workers)]
+        self.results = context.Queue()
+
+    # Method that returns the index of the worker owning a state
+    def owner(self, state):
+        return (state * 2654435761 & 0xffffffff) % self.workers
+
+    # Method that runs the search from a state - outputs a SearchResult and the number of states every worker expanded
+    # The coordinating process only starts the workers, watches for termination and follows the parents of the goal back to
+    # the start state by asking their owners
+    def traverse(self, begin):
+        processes = [self.context.Process(target=self.work, args=(index,), daemon=True) for index in range(self.workers)]
+        for process in processes:
+            process.start()
+        try:
+            self.send(self.owner(begin), [(0.0, begin, -1)])
+            while True:
+                time.sleep(HDA_STAR_POLL)
+                with self.lock:
+                    if self.batches[0] == self.batches[1] and all(self.idle):
+                        self.done.set()
+                        break
+                if any(process.exitcode is not None for process in processes):
+                    raise RuntimeError("an HDA-star worker process stopped unexpectedly")
+            expansions = [0] * self.workers
+            for _ in range(self.workers):
+                index, count = self.results.get()
+                expansions[index] = count
+            goal = self.goal[0]
+            if goal == -1:
+                return SearchResult(None, sum(expansions), {}, None), expansions
+            route = [goal]
+            while True:
+                self.inboxes[self.owner(route[-1])].put(route[-1])
+                state = self.results.get()
+                if state == -1:
+                    break
+                route.append(state)
+            route.reverse()
+            return SearchResult(goal, sum(expansions), {goal: self.incumbent[0]}, None, route), expansions
+        finally:
+            for inbox in self.inboxes:
+                inbox.put(None)
+            for process in processes:
+                process.join(1)
+                if process.is_alive():
+                    process.terminate()
+
+    # Method that sends a batch of (cost, state, parent) entries to the worker owning the states
+    def send(self, index, batch):
+        with self.lock:
+            self.batches[0] += 1
+        self.inboxes[index].put(batch)
+
+    # Method executed by a worker process, searches from the states it receives until the search is done, then answers parent
+    # requests for the states it owns
+    def work(self, index):
+        problem = self.problem
+        offsets, targets, costs = problem.search_graph()
+        goals, h = problem.goal_ids, problem.h
+        lock, batches, idle, incumbent, inbox = self.lock, self.batches, self.idle, self.incumbent, self.inboxes[index]
+        owner, workers = self.owner, self.workers
+        g, parent = {}, {}
+        opened = [] # Heap of (f, -cost, state) entries, among equal f the deepest state is closest to a goal
+        outgoing = [[] for _ in range(workers)]
+        expansions = 0
+        while True:
+            if not opened or opened[0][0] >= incumbent[0]:
+                opened.clear()
+                self.flush(outgoing)
+                with lock:
+                    idle[index] = 1
+                batch = None
+                while batch is None:
+                    if self.done.is_set():
+                        self.answer(index, expansions, parent)
+                        return
+                    try:
+                        batch = inbox.get(timeout=HDA_STAR_POLL)
+                    except queue.Empty:
+                        pass
+                with lock:
+                    batches[1] += 1
+                    idle[index] = 0
+                self.accept(batch, g, parent, opened, h)
+                continue
+            if expansions % HDA_STAR_BATCH == 0: # Keep the other workers fed and take in what they sent
+                self.flush(outgoing)
+                while True:
+                    try:
+                        batch = inbox.get_nowait()
+                    except queue.Empty:
+                        break
+                    with lock:
+                        batches[1] += 1
+                    self.accept(batch, g, parent, opened, h)
+            f, cost, state = heappop(opened)
+            cost = -cost
+            if cost > g[state]:
+                continue
+            expansions += 1
+            if state in goals:
+                with lock:
+                    if cost < incumbent[0]:
+                        incumbent[0] = cost
+                        self.goal[0] = state
+                continue
+            for i in range(offsets[state], offsets[state + 1]):
+                child = targets[i]
+                child_cost = cost + costs[i]
+                f_child = child_cost + h[child]
+                if f_child >= incumbent[0]:
+                    continue
+                child_owner = owner(child)
+                if child_owner == index:
+                    if child_cost < g.get(child, inf):
+                        g[child] = child_cost
+                        parent[child] = state
+                        heappush(opened, (f_child, -child_cost, child))
+                else:
+                    pending = outgoing[child_owner]
+                    pending.append((child_cost, child, state))
+                    if len(pending) >= HDA_STAR_BATCH:
+                        self.send(child_owner, pending)
+                        outgoing[child_owner] = []
+
+    # Method that sends all successors waiting for other workers
+    def flush(self, outgoing):
+        for index, pending in enumerate(outgoing):
+            if pending:
+                self.send(index, pending)
+                outgoing[index] = []
+
+    # Method that adds received entries to the frontier of a worker, the ones that improve the cost of their state
+    def accept(self, batch, g, parent, opened, h):
+        bound = self.incumbent[0]
+        for cost, state, source in batch:
+            if cost < g.get(state, inf):
+                g[state] = cost
+                parent[state] = source
+                if cost + h[state] < bound:
+                    heappush(opened, (cost + h[state], -cost, state))
+
+    # Method that reports the expansions of a worker and then answers requests for the parents of its states until it is stopped
+    def answer(self, index, expansions, parent):
+        self.results.put((index, expansions))
+        while True:
+            state = self.inboxes[index].get()
+            if state is None:
+                return
+            self.results.put(parent[state])
+
+
+# Class that implements LPA-star, lifelong planning A-star, on a state space whose transitions can be inserted, deleted or
+# change their cost after a path was found. Instead of searching again from scratch, the previous search is repaired.
+# The CSR arrays are not changed, edited transitions are kept in dictionaries by source and by target that replace the
+# transitions of the same pair of states. Every state has a cost g as of its last expansion and a cost rhs looked ahead from
+# its predecessors, and only the states where the two differ are queued, ordered by [min(g, rhs) + h, min(g, rhs)]. So after
+# a local edit only the states whose cost the edit changed, and that could lie on a better path, are expanded again.
+# All goals lead to one extra sink state through free transitions, so the cheapest goal is planned for.
+# The heuristic has to stay consistent under the edits, which the zero heuristic always does. With free transitions,
+# states on a cycle of them could keep each other's old costs after a cost increase, so on such graphs every plan starts over
+class IncrementalPlanner:
+    def __init__(self, problem, begin, h=None):
+        self.problem = problem
+        self.begin = begin
+        self.goals = problem.goal_ids
+        self.sink = len(problem.names)
+        self.h = array("d", h) if h is not None else array("d", bytes(8 * len(problem.names)))
+        self.h.append(0.0)
+        self.edits = dict() # Source ID -> {target ID: cost, None for a deleted transition}
+        self.reverse_edits = dict() # The same edits by target ID
+        self.free = 0.0 in problem.costs # Whether there are free transitions
+        self.reset()
+
+    # Method that forgets all costs found, the next plan is a search from scratch
+    def reset(self):
+        self.g = array("d", [inf]) * (self.sink + 1)
+        self.rhs = array("d", [inf]) * (self.sink + 1)
+        self.rhs[self.begin] = 0
+        self.queue = [] # Heap of (key, key, state ID) entries, an entry is stale once its key is not the one in queued
+        self.queued = dict()
+        self.update_vertex(self.begin)
+
+    # Method that returns the outgoing transitions of a state as (state ID, cost) pairs, with the edits applied
+    def successors(self, state):
+        if state == self.sink:
+            return
+        edited = self.edits.get(state, {})
+        for child, cost in self.problem.successors(state):
+            if child not in edited:
+                yield child, cost
+        for child, cost in edited.items():
+            if cost is not None:
+                yield child, cost
+        if state in self.goals:
+            yield self.sink, 0.0
+
+    # Method that returns the incoming transitions of a state as (state ID, cost) pairs, with the edits applied
+    def predecessors(self, state):
+        if state == self.sink:
+            yield from ((goal, 0.0) for goal in self.goals)
+            return
+        edited = self.reverse_edits.get(state, {})
+        for source, cost in self.problem.predecessors(state):
+            if source not in edited:
+                yield source, cost
+        for source, cost in edited.items():
+            if cost is not None:
+                yield source, cost
+
+    # Method that returns the priority of a state in the queue
+    def key(self, state):
+        cost = min(self.g[state], self.rhs[state])
+        return cost + self.h[state], cost
+
+    # Method that recomputes the rhs of a state from its predecessors and queues the state if it differs from its g
+    def update_vertex(self, state):
+        g, rhs = self.g, self.rhs
+        if state != self.begin:
+            rhs[state] = min((g[source] + cost for source, cost in self.predecessors(state)), default=inf)
+        if g[state] != rhs[state]:
+            key = self.key(state)
+            if self.queued.get(state) != key:
+                self.queued[state] = key
+                heappush(self.queue, key + (state,))
+        else:
+            self.queued.pop(state, None)
+
+    # Method that expands queued states until the cost of the sink is final - returns the number of expansions
+    # A state whose rhs is lower takes it as its cost, one whose rhs is higher gives up its cost and is queued again.
+    # States tied with the sink are expanded too, a goal has the same key as the sink it leads to for free.
+    # A limit of the budget of the state space stops it early, the queue is left as it is and the next plan goes on from it
+    def compute(self):
+        g, rhs, sink, queue, queued = self.g, self.rhs, self.sink, self.queue, self.queued
+        budget = self.problem.budget
+        expanded = 0
+        checkpoint = budget.start() if budget is not None else inf
+        while True:
+            while queue and queued.get(queue[0][2]) != queue[0][:2]:
+                heappop(queue)
+            if not queue or (queue[0][:2] > self.key(sink) and g[sink] == rhs[sink]):
+                return expanded
+            if expanded == checkpoint:
+                checkpoint = budget.check(expanded)
+                if checkpoint is None:
+                    return expanded
+            state = heappop(queue)[2]
+            del queued[state]
+            expanded += 1
+            if g[state] > rhs[state]:
+                g[state] = rhs[state]
+            else:
+                g[state] = inf
+                self.update_vertex(state)
+            for child, _ in self.successors(state):
+                self.update_vertex(child)
+
+    # Method that follows transitions on cheapest paths back from the sink - returns the path of state IDs
+    # Among the predecessors on a cheapest path the one with the smallest ID is taken. Only a cycle of free transitions can
+    # lead to a state already on the path, the search then backs up and tries the next predecessor
+    def route(self):
+        g = self.g
+        res = [self.sink]
+        seen = {self.sink}
+        while res[-1] != self.begin:
+            state = res[-1]
+            source = min((source for source, cost in self.predecessors(state) if g[source] + cost == g[state] and source not in seen), default=None)
+            if source is None:
+                res.pop()
+            else:
+                seen.add(source)
+                res.append(source)
+        return res[:0:-1]
+
+    # Method that plans a path with the edits so far - outputs a SearchResult whose visited states are the expansions of
+    # this plan alone. A plan stopped by a limit reports the lowest key left in the queue as its bound
+    def plan(self):
+        if self.free:
+            self.reset()
+        visited = self.compute()
+        budget = self.problem.budget
+        if budget is not None and budget.reason is not None:
+            return self.problem.aborted(visited, self.g, None, self.queue[0][0])
+        if self.g[self.sink] == inf:
+            return SearchResult(None, visited, self.g, None)
+        route = self.route()
+        return SearchResult(route[-1], visited, self.g, None, route)
+
+    # Method that returns the ID of a state given by name
+    def state_id(self, name):
+        if name not in self.problem.ids:
+            raise ValueError("unknown state {}".format(name))
+        return self.problem.ids[name]
+
+    # Method that returns the cost of the cheapest transition between two states, None when there is none
+    def cost(self, source, target):
+        return min((cost for child, cost in self.successors(source) if child == target), default=None)
+
+    # Method that sets the cost of the transitions between two states, None deletes them
+    def set_edge(self, source, target, cost):
+        if cost is not None and not 0 <= cost < inf:
+            raise ValueError("transition costs have to be finite and not negative")
+        self.free = self.free or cost == 0
+        self.edits.setdefault(source, dict())[target] = cost
+        self.reverse_edits.setdefault(target, dict())[source] = cost
+        self.update_vertex(target)
+
+    # Methods that edit the transition between two states given by name
+    def insert_edge(self, source, target, cost):
+        source, target = self.state_id(source), self.state_id(target)
+        if self.cost(source, target) is not None:
+            raise ValueError("transition {} => {} already exists".format(self.problem.names[source], self.problem.names[target]))
+        self.set_edge(source, target, cost)
+
+    def update_edge(self, source, target, cost):
+        source, target = self.state_id(source), self.state_id(target)
+        if self.cost(source, target) is None:
+            raise ValueError("no transition {} => {}".format(self.problem.names[source], self.problem.names[target]))
+        self.set_edge(source, target, cost)
+
+    def delete_edge(self, source, target):
+        source, target = self.state_id(source), self.state_id(target)
+        if self.cost(source, target) is None:
+            raise ValueError("no transition {} => {}".format(self.problem.names[source], self.problem.names[target]))
+        self.set_edge(source, target, None)
+
+    # Method that applies the edits of a file and plans again after every batch - yields the number of edits and the
+    # SearchResult of every batch
+    # Lines are "insert <state> <state> <cost>", "update <state> <state> <cost>" or "delete <state> <state>", and a line
+    # "replan" ends a batch, as does the end of the file. Lines starting with # are comments
+    def replay(self, file_edits):
+        edits = 0
+        with open(file_edits, "r") as input_file:
+            for number, line in enumerate(input_file, 1):
+                words = line.split()
+                if not words or words[0][0] == "#":
+                    continue
+                if words == ["replan"]:
+                    yield edits, self.plan()
+                    edits = 0
+                    continue
+                try:
+                    if words[0] in ("insert", "update") and len(words) == 4:
+                        (self.insert_edge if words[0] == "insert" else self.update_edge)(words[1], words[2], float(words[3]))
+                    elif words[0] == "delete" and len(words) == 3:
+                        self.delete_edge(words[1], words[2])
+                    else:
+                        raise ValueError("cannot parse edit {}".format(line.strip()))
+                except ValueError as error:
+                    raise InputError("{}:{}: {}".format(file_edits, number, error)) from None
+                edits += 1
+        if edits:
+            yield edits, self.plan()
+
+
+# State space and arguments shared with the worker processes of a heuristic batch
+# They are set before the pool is started, so forked workers inherit the parsed graph arrays instead of receiving copies
+BATCH_PROBLEM = None
+BATCH_ARGS = None
+
+# Function that runs the heuristic-dependent tasks (A-star and heuristic checks) for one heuristic descriptor file
+def evaluate_heuristic(problem, file_heuristic, args):
+    problem.load_heuristic(file_heuristic, not args.compile_cache)
+    if args.compile_cache:
+        problem.compile_heuristic_cache()
+    if args.alg == "astar":
+        problem.a_star()
+    elif args.alg == "idastar":
+        problem.ida_star()
+    elif args.alg == "smastar":
+        problem.sma_star(args.node_budget)
+    elif args.alg == "wastar":
+        problem.weighted_a_star(args.w)
+    elif args.alg == "arastar":
+        problem.ara_star(args.w, args.w_step)
+    elif args.alg == "rtaastar":
+        problem.rtaa_star(args.budget, args.trials, args.learned)
+    elif args.alg == "hdastar":
+        problem.hda_star(args.jobs)
+    elif args.alg == "lpastar":
+        problem.lpa_star(args.edits)
+    if args.check_optimistic:
+        problem.determine_optimism(args.summary)
+    if args.check_consistent:
+        problem.determine_consistency(args.summary)
+
+# Function executed by the worker processes of a heuristic batch, returns the output of evaluate_heuristic as a string
+def evaluate_heuristic_worker(file_heuristic):
+    output = io.StringIO()
+    with redirect_stdout(output):
+        evaluate_heuristic(BATCH_PROBLEM, file_heuristic, BATCH_ARGS)
+    return output.getvalue()
+
+# Function that expands the heuristic arguments, which may be file names or glob patterns, into a list of files
+# An existing file is taken as it is, even when its name has characters like [ that glob would read as a pattern
+def expand_heuristics(patterns):
+    res = []
+    for pattern in patterns or []:
+        res.extend(sorted(glob.glob(pattern)) if glob.has_magic(pattern) and not os.path.exists(pattern) else [pattern])
+    return res
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Search the state space of a problem")
-    parser.add_argument("--alg", type=str, required=False, choices=["astar", "ucs", "bfs"],
+    parser.add_argument("--alg", type=str, required=False, choices=["astar", "ucs", "bfs", "bidir-ucs", "bidir-bfs", "idastar", "smastar", "ch", "wastar", "arastar", "rtaastar", "hdastar", "lpastar"],
                         help="search algorithm used", metavar="algorithm")
-    parser.add_argument("--ss", type=str, required=True,
-                        help="state space descriptor file", metavar="statespace")
-    parser.add_argument("--h", type=str, required=False,
-                        help="heuristic descriptor file", metavar="heuristic")
+    parser.add_argument("--ss", type=str, required=False, nargs="+",
+                        help="state space descriptor file, several can be served at once", metavar="statespace")
+    parser.add_argument("--domain", type=str, required=False,
+                        help="domain plugin giving the state space implicitly, as module[:Class] or file.py[:Class]", metavar="domain")
+    parser.add_argument("--domain-args", type=str, required=False, nargs="*", default=[],
+                        help="arguments passed to the domain plugin class, name=value for keyword arguments", metavar="argument")
+    parser.add_argument("--heuristic-cache", type=int, required=False, default=2 ** 20,
+                        help="number of heuristic values of a domain plugin kept in the LRU cache", metavar="entries")
+    parser.add_argument("--h", type=str, required=False, nargs="+",
+                        help="heuristic descriptor files or glob patterns", metavar="heuristic")
+    parser.add_argument("--w", type=float, required=False, default=2.0,
+                        help="heuristic weight of weighted A-star, and the initial one of ARA-star", metavar="weight")
+    parser.add_argument("--w-step", type=float, required=False, default=0.5,
+                        help="amount by which ARA-star lowers the weight after each solution", metavar="step")
+    parser.add_argument("--budget", type=int, required=False, default=16,
+                        help="expansions RTAA-star may spend looking ahead before each move", metavar="expansions")
+    parser.add_argument("--trials", type=int, required=False, default=1,
+                        help="number of RTAA-star runs from the initial state that share the learned heuristic", metavar="trials")
+    parser.add_argument("--learned", type=str, required=False,
+                        help="heuristic descriptor file RTAA-star reads learned values from and writes them back to", metavar="file")
+    parser.add_argument("--edits", type=str, required=False,
+                        help="file of transition edits LPA-star replans after, batches are ended by replan lines", metavar="file")
+    parser.add_argument("--node-budget", type=int, required=False, default=100000,
+                        help="maximum number of search tree nodes SMA-star keeps in memory", metavar="nodes")
+    parser.add_argument("--start", type=str, required=False, nargs="+",
+                        help="start states of contraction hierarchy queries and of A-star with --landmarks, the initial state by default", metavar="state")
+    parser.add_argument("--external", required=False, action='store_true',
+                        help="keep the frontier and the visited states of bfs or ucs in temporary files")
+    parser.add_argument("--memory-ceiling", type=int, required=False, default=256,
+                        help="megabytes of frontier and visited states held in memory by --external", metavar="megabytes")
+    parser.add_argument("--spill-dir", type=str, required=False,
+                        help="directory for the temporary files of --external, the system default if not given", metavar="directory")
+    parser.add_argument("--prune-dead-ends", required=False, action='store_true',
+                        help="skip successors that cannot reach a goal state in BFS, UCS and A-star")
+    parser.add_argument("--landmarks", type=int, required=False,
+                        help="use the ALT heuristic over this many landmarks instead of a heuristic file", metavar="landmarks")
     parser.add_argument("--check-optimistic", required=False, action='store_true',
                         help="check whether the heuristic is optimistic")
     parser.add_argument("--check-consistent", required=False, action='store_true',
                         help="check whether the heuristic is optimistic")
+    parser.add_argument("--summary", required=False, action='store_true',
+                        help="only print the conclusion and number of failed conditions of heuristic checks")
+    parser.add_argument("--compile-cache", required=False, action='store_true',
+                        help="parse the descriptor files and write binary caches that later runs load instead")
+    parser.add_argument("--jobs", type=int, required=False, default=1,
+                        help="number of worker processes used when several heuristics are given, and by hdastar", metavar="jobs")
+    parser.add_argument("--serve", type=str, required=False, nargs="?", const="-",
+                        help="answer JSON-lines search requests from standard input, or from a Unix socket at the given path", metavar="socket")
+    parser.add_argument("--max-expansions", type=int, required=False,
+                        help="abort searches after this many expanded states, except hdastar", metavar="expansions")
+    parser.add_argument("--max-seconds", type=float, required=False,
+                        help="abort searches after this many seconds, except hdastar", metavar="seconds")
+    parser.add_argument("--max-memory-mb", type=float, required=False,
+                        help="abort searches once the process has used this many megabytes, except hdastar", metavar="megabytes")
+    parser.add_argument("--stats", type=str, required=False, nargs="?", const="-",
+                        help="write search statistics as JSON to the given file, or to standard error", metavar="file")
+    parser.add_argument("--no-cache", required=False, action='store_true',
+                        help="neither read nor write the result cache")
+    parser.add_argument("--result-cache", type=str, required=False,
+                        default=os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "lab1", "results.sqlite"),
+                        help="SQLite file holding the reports of earlier runs", metavar="file")
+    parser.add_argument("--result-cache-size", type=int, required=False, default=64,
+                        help="megabytes of reports kept in the result cache before the least recently used are evicted", metavar="megabytes")
     args = parser.parse_args()
+    if (args.ss is None) == (args.domain is None):
+        parser.error("exactly one of --ss and --domain is required")
+    if any(limit is not None and limit <= 0 for limit in (args.max_expansions, args.max_seconds, args.max_memory_mb)):
+        parser.error("--max-expansions, --max-seconds and --max-memory-mb have to be positive")
+    if args.max_memory_mb is not None and resource is None:
+        parser.error("--max-memory-mb is not available on this platform")
+    if args.alg == "hdastar" and (args.max_expansions is not None or args.max_seconds is not None or args.max_memory_mb is not None):
+        parser.error("--max-expansions, --max-seconds and --max-memory-mb are not available with the hdastar algorithm")
+    unmatched = [pattern for pattern in args.h or [] if not os.path.exists(pattern) and not glob.glob(pattern)]
+    if unmatched:
+        parser.error("no heuristic descriptor files match {}".format(" ".join(unmatched)))
+    if args.serve is not None:
+        if args.domain is not None:
+            parser.error("--serve needs state space descriptor files")
+        if args.stats is not None:
+            parser.error("--stats is not available in serve mode")
+        spaces = [StateSpace(file_statespace) for file_statespace in args.ss]
+        for space in spaces:
+            space.prune_dead_ends = args.prune_dead_ends
+            space.search_graph() # Built before the state space is copied for heuristics and requests
+            space.search_graph(True)
+        SearchServer(spaces, expand_heuristics(args.h), args.node_budget, (args.max_expansions, args.max_seconds, args.max_memory_mb),
+                     args.landmarks or ALT_LANDMARKS).serve(args.serve, args.jobs)
+        return
+    if args.ss is not None:
+        if len(args.ss) > 1:
+            parser.error("several state spaces are only accepted by --serve")
+        args.ss = args.ss[0]
+    if args.domain is not None and (args.compile_cache or args.alg not in (None, "bfs", "ucs", "astar")):
+        parser.error("--domain supports only the bfs, ucs and astar algorithms and the heuristic checks")
+    if args.w < 1 or args.w_step <= 0:
+        parser.error("--w has to be at least 1 and --w-step positive")
+    if args.external and (args.alg not in ("bfs", "ucs") or args.domain is not None):
+        parser.error("--external supports only the bfs and ucs algorithms on state space files")
+    if args.memory_ceiling < 1:
+        parser.error("--memory-ceiling has to be positive")
+    if args.budget < 1 or args.trials < 1:
+        parser.error("--budget and --trials have to be positive")
+    if args.edits is not None and args.alg != "lpastar":
+        parser.error("--edits is only used by the lpastar algorithm")
+    if args.start and args.alg != "ch" and (args.alg != "astar" or args.landmarks is None):
+        parser.error("--start is only used by the ch algorithm and by astar with --landmarks")
+    if args.landmarks is not None and (args.domain is not None or args.h):
+        parser.error("--landmarks cannot be combined with --domain or --h")
+    if args.landmarks is not None and args.landmarks < 1:
+        parser.error("--landmarks has to be positive")
+    heuristics = expand_heuristics(args.h)
 
-    problem = StateSpace(args.ss, args.h)
-    if args.alg == "astar":
-        problem.a_star()
+    # Problems with the inputs that only show once the state space is read are reported like the ones with the arguments
+    def run_checked(args, heuristics):
+        try:
+            run(args, heuristics)
+        except InputError as error:
+            parser.error(str(error))
+
+    # Runs that only read descriptor files are answered from the result cache without parsing or searching
+    # Domain plugins are code that is not hashed, and compiling caches is wanted for its side effects, so neither is cached.
+    # Neither is real-time search, which reports measured latencies and updates its learned heuristic file, nor HDA-star,
+    # whose expansion counts and choice among equally cheap paths depend on how the workers are scheduled, nor runs that
+    # collect statistics, which describe the run itself, or that may be stopped by the clock or by memory use
+    if (args.no_cache or args.domain is not None or args.compile_cache or args.alg in ("rtaastar", "hdastar") or args.stats is not None
+            or args.max_seconds is not None or args.max_memory_mb is not None):
+        run_checked(args, heuristics)
+        return
+    try:
+        results = ResultCache(args.result_cache, args.result_cache_size * 2 ** 20)
+        key = results.key(args, heuristics)
+        report = results.get(key)
+    except (OSError, sqlite3.Error):
+        run_checked(args, heuristics)
+        return
+    if report is not None:
+        print(report, end="")
+        return
+    output = TeeOutput(sys.stdout) # The report is printed as it is produced and recorded at the same time
+    with redirect_stdout(output):
+        run_checked(args, heuristics) # A run that fails is not stored
+    try:
+        results.put(key, output.getvalue())
+    except sqlite3.Error:
+        pass
+
+
+# Function that returns the limits of searches given by the arguments, None when there are none
+def budget_from(args):
+    if args.max_expansions is None and args.max_seconds is None and args.max_memory_mb is None:
+        return None
+    return SearchBudget(args.max_expansions, args.max_seconds, args.max_memory_mb)
+
+
+# Function that builds the state space and runs the searches and checks requested by the arguments
+def run(args, heuristics):
+    global BATCH_PROBLEM, BATCH_ARGS
+    stats = SearchStats() if args.stats is not None else None
+    # The state space and its oracle heuristic are built once and shared by all heuristics
+    with stats.phase("parse") if stats is not None else nullcontext():
+        if args.domain is not None:
+            problem = ImplicitStateSpace(load_domain(args.domain, args.domain_args), args.domain, heuristic_cache_size=args.heuristic_cache)
+        else:
+            problem = StateSpace(args.ss, use_cache=not args.compile_cache)
+    problem.stats = stats
+    problem.budget = budget_from(args)
+    unknown = [start for start in args.start or [] if start not in problem.ids]
+    if unknown:
+        raise InputError("unknown start state {}".format(" ".join(unknown)))
+    if args.compile_cache:
+        problem.compile_cache()
+    problem.prune_dead_ends = args.prune_dead_ends
+    if args.external:
+        problem.external(args.alg, args.memory_ceiling * 2 ** 20, args.spill_dir)
     elif args.alg == "bfs":
         problem.bfs()
     elif args.alg == "ucs":
         problem.ucs()
-    if args.check_optimistic:
-        problem.determine_optimism()
-    if args.check_consistent:
-        problem.determine_consistency()
+    elif args.alg == "bidir-ucs":
+        problem.bidirectional_ucs()
+    elif args.alg == "bidir-bfs":
+        problem.bidirectional_bfs()
+    elif args.alg == "ch":
+        problem.contraction_hierarchy(write=args.compile_cache)
+        problem.ch(args.start)
+    if args.landmarks is not None:
+        problem.landmark_heuristic(args.landmarks, write=args.compile_cache)
+    if not heuristics:
+        if args.alg == "astar":
+            problem.a_star(args.start)
+        elif args.alg == "idastar":
+            problem.ida_star()
+        elif args.alg == "smastar":
+            problem.sma_star(args.node_budget)
+        elif args.alg == "wastar":
+            problem.weighted_a_star(args.w)
+        elif args.alg == "arastar":
+            problem.ara_star(args.w, args.w_step)
+        elif args.alg == "rtaastar":
+            problem.rtaa_star(args.budget, args.trials, args.learned)
+        elif args.alg == "hdastar":
+            problem.hda_star(args.jobs)
+        elif args.alg == "lpastar":
+            problem.lpa_star(args.edits)
+        if args.check_optimistic:
+            problem.determine_optimism(args.summary)
+        if args.check_consistent:
+            problem.determine_consistency(args.summary)
+    else:
+        if args.check_optimistic and args.domain is None:
+            problem.oracle_heuristic()
+        # HDA-star uses the worker processes itself, and the processes of a batch could not start their own
+        # Statistics are collected in this process, so with them the heuristics are evaluated here one after another
+        if args.jobs > 1 and len(heuristics) > 1 and args.alg != "hdastar" and stats is None and "fork" in multiprocessing.get_all_start_methods():
+            BATCH_PROBLEM, BATCH_ARGS = problem, args
+            with multiprocessing.get_context("fork").Pool(min(args.jobs, len(heuristics))) as pool:
+                for output in pool.imap(evaluate_heuristic_worker, heuristics):
+                    print(output, end="")
+        else:
+            for file_heuristic in heuristics:
+                evaluate_heuristic(problem, file_heuristic, args)
+    if stats is not None:
+        stats.write(args.stats)
 
 
 if __name__ == "__main__":
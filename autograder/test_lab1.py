@@ -0,0 +1,742 @@
+# Tests that compare the searches of Lab1/solution.py with the baseline solution in lab1py/solution.py
+# Random state spaces are written in the descriptor format, both programs are run on them and their outputs are parsed
+# the same way the autograder parses them. Run with: python -m pytest autograder
+import heapq
+import importlib.util
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from grader_lab1 import parse_output
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOLUTION = os.path.join(ROOT, "Lab1", "solution.py")
+BASELINE = os.path.join(ROOT, "lab1py", "solution.py")
+SEEDS = range(12)
+DEAD_END = 1000 # Heuristic value of states without a path to a goal, keeps the heuristic consistent
+
+
+# Function that runs a solution with the given arguments - returns the parsed output
+def run(solution, *args):
+    extra = ("--no-cache",) if solution == SOLUTION else ()
+    res = subprocess.run([sys.executable, solution] + list(map(str, args + extra)), capture_output=True, text=True, timeout=60)
+    assert res.returncode == 0, res.stderr
+    return parse_output(res.stdout)
+
+
+# Function that returns the value of an output field, None when it is missing
+def field(output, name):
+    return output[name]["value"] if name in output else None
+
+
+# Function that writes a random state space descriptor file and a consistent heuristic for it (half of the cost to the
+# nearest goal) - returns the two file names
+# Costs are small integers up to max_cost, so ties between paths are common, and some transitions are free or repeated
+def random_statespace(directory, seed, max_cost=9, zero_rate=0.05):
+    rng = random.Random(seed)
+    size = rng.randint(8, 40)
+    names = ["s{:02d}".format(i) for i in range(size)]
+    init = rng.choice(names)
+    goals = rng.sample([name for name in names if name != init], rng.randint(1, 3))
+    transitions = {name: [] for name in names}
+    for _ in range(rng.randint(size, 3 * size)):
+        source, target = rng.choice(names), rng.choice(names)
+        cost = 0 if rng.random() < zero_rate else rng.randint(1, max_cost)
+        transitions[source].append((target, cost))
+    distances = {goal: 0 for goal in goals}
+    opened = [(0, goal) for goal in goals]
+    while opened:
+        distance, state = heapq.heappop(opened)
+        if distance > distances[state]:
+            continue
+        for source in names:
+            for target, cost in transitions[source]:
+                if target == state and distance + cost < distances.get(source, float("inf")):
+                    distances[source] = distance + cost
+                    heapq.heappush(opened, (distance + cost, source))
+    file_statespace = os.path.join(directory, "ss_{}.txt".format(seed))
+    with open(file_statespace, "w") as output_file:
+        output_file.write("# Random state space {}\n{}\n{}\n".format(seed, init, " ".join(goals)))
+        for name in names:
+            output_file.write("{}:{}\n".format(name, "".join(" {},{}".format(target, cost) for target, cost in transitions[name])))
+    file_heuristic = os.path.join(directory, "h_{}.txt".format(seed))
+    with open(file_heuristic, "w") as output_file:
+        for name in names:
+            output_file.write("{}: {}\n".format(name, distances[name] // 2 if name in distances else DEAD_END))
+    return file_statespace, file_heuristic
+
+
+@pytest.fixture(scope="module")
+def statespaces(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("statespaces")
+    return {seed: random_statespace(str(directory), seed) for seed in SEEDS}
+
+
+@pytest.fixture(scope="module")
+def baseline(statespaces):
+    res = {}
+    for seed, (file_statespace, file_heuristic) in statespaces.items():
+        res[seed, "bfs"] = run(BASELINE, "--ss", file_statespace, "--alg", "bfs")
+        res[seed, "ucs"] = run(BASELINE, "--ss", file_statespace, "--alg", "ucs")
+    return res
+
+
+# Algorithms with the arguments they are run with and the baseline search they are compared to
+# Optimal searches must find a solution exactly when UCS does, at the same cost. BFS variants must print the same report
+# as BFS, except for the states visited when dead ends are pruned, and bidirectional BFS a path of the same length.
+# Weighted A-star may cost up to its weight times more, and real-time search only has to find a solution when there is one
+ALGORITHMS = [
+    (("--alg", "bfs"), "bfs", "report"),
+    (("--alg", "bfs", "--external", "--memory-ceiling", "1"), "bfs", "report"),
+    (("--alg", "bfs", "--prune-dead-ends"), "bfs", "path"),
+    (("--alg", "bidir-bfs"), "bfs", "length"),
+    (("--alg", "ucs"), "ucs", "cost"),
+    (("--alg", "ucs", "--external", "--memory-ceiling", "1"), "ucs", "cost"),
+    (("--alg", "ucs", "--prune-dead-ends"), "ucs", "cost"),
+    (("--alg", "bidir-ucs"), "ucs", "cost"),
+    (("--alg", "ch"), "ucs", "cost"),
+    (("--alg", "astar", "--h", "{h}"), "ucs", "cost"),
+    (("--alg", "astar", "--landmarks", "2"), "ucs", "cost"),
+    (("--alg", "idastar", "--h", "{h}"), "ucs", "cost"),
+    (("--alg", "smastar", "--h", "{h}"), "ucs", "cost"),
+    (("--alg", "arastar", "--h", "{h}"), "ucs", "cost"),
+    (("--alg", "hdastar", "--jobs", "2", "--h", "{h}"), "ucs", "cost"),
+    (("--alg", "lpastar"), "ucs", "cost"),
+    (("--alg", "lpastar", "--h", "{h}"), "ucs", "cost"),
+    (("--alg", "wastar", "--w", "2", "--h", "{h}"), "ucs", "bounded"),
+    (("--alg", "rtaastar", "--h", "{h}"), "ucs", "found"),
+    (("--alg", "rtaastar", "--budget", "1"), "ucs", "found"),
+]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("args, reference, comparison", ALGORITHMS, ids=lambda value: " ".join(value) if isinstance(value, tuple) else None)
+def test_matches_baseline(statespaces, baseline, seed, args, reference, comparison):
+    file_statespace, file_heuristic = statespaces[seed]
+    output = run(SOLUTION, "--ss", file_statespace, *(arg.format(h=file_heuristic) for arg in args))
+    expected = baseline[seed, reference]
+    assert field(output, "FOUND_SOLUTION") == field(expected, "FOUND_SOLUTION")
+    if field(expected, "FOUND_SOLUTION") != "yes" or comparison == "found":
+        return
+    if comparison in ("report", "path"):
+        for name in ("STATES_VISITED", "PATH_LENGTH", "TOTAL_COST", "PATH")[comparison == "path":]:
+            assert field(output, name) == field(expected, name), name
+    elif comparison == "length":
+        assert field(output, "PATH_LENGTH") == field(expected, "PATH_LENGTH")
+    elif comparison == "cost":
+        assert field(output, "TOTAL_COST") == field(expected, "TOTAL_COST")
+    else:
+        assert float(field(output, "TOTAL_COST")) <= 2 * float(field(expected, "TOTAL_COST"))
+
+
+# State spaces where a state is reached at the same cost from two parents and the parent that reaches it first has the
+# larger name. Both searches have to keep the first parent, like the baseline
+TIES = {
+    "later parent with smaller name": "s\ng\ns: z,1 a,2\nz: c,2\na: c,1\nc: g,1\ng:\n",
+    "parallel transitions": "s\ng\ns: m,1 b,2 b,2\nm: c,3 c,3\nb: c,2\nc: g,1\ng:\n",
+}
+
+
+@pytest.mark.parametrize("alg", ["ucs", "astar"])
+@pytest.mark.parametrize("statespace", TIES.values(), ids=TIES.keys())
+def test_equal_cost_ties_match_baseline(tmp_path, statespace, alg):
+    file_statespace = tmp_path / "ties.txt"
+    file_statespace.write_text(statespace)
+    file_heuristic = tmp_path / "ties_heuristic.txt"
+    file_heuristic.write_text("".join("{}: 0\n".format(line.split(":")[0]) for line in statespace.splitlines()[2:]))
+    args = ("--ss", file_statespace, "--alg", alg) + (("--h", file_heuristic) if alg == "astar" else ())
+    assert run(SOLUTION, *args) == run(BASELINE, *args)
+
+
+# Random state spaces where almost every state is reached by several paths of the same cost - the whole report of UCS and
+# A-star, path included, has to be the one of the baseline. There are no free transitions, the baseline A-star can loop on them
+@pytest.mark.parametrize("alg", ["ucs", "astar"])
+@pytest.mark.parametrize("seed", range(100, 124))
+def test_tie_heavy_reports_match_baseline(tmp_path, seed, alg):
+    file_statespace, file_heuristic = random_statespace(str(tmp_path), seed, max_cost=2, zero_rate=0)
+    args = ("--ss", file_statespace, "--alg", alg) + (("--h", file_heuristic) if alg == "astar" else ())
+    assert run(SOLUTION, *args) == run(BASELINE, *args)
+
+
+# When the start state is a goal, the baseline prints the cost as the integer 0, every search has to do the same
+@pytest.mark.parametrize("args", [args for args, _, _ in ALGORITHMS], ids=" ".join)
+def test_start_goal_costs_zero(tmp_path, args):
+    file_statespace = tmp_path / "start_goal.txt"
+    file_statespace.write_text("g\ng s\ng: s,1\ns: g,2\n")
+    file_heuristic = tmp_path / "start_goal_heuristic.txt"
+    file_heuristic.write_text("g: 0\ns: 0\n")
+    output = run(SOLUTION, "--ss", file_statespace, *(arg.format(h=file_heuristic) for arg in args))
+    expected = run(BASELINE, "--ss", file_statespace, "--alg", "ucs")
+    assert field(expected, "TOTAL_COST") == "0"
+    for name in ("FOUND_SOLUTION", "PATH_LENGTH", "TOTAL_COST", "PATH"):
+        assert field(output, name) == field(expected, name), name
+
+
+# A heuristic pattern that matches no file is a usage error, not an empty list of heuristics
+@pytest.mark.parametrize("pattern", ["no_such_heuristic_*.txt", "no_such_heuristic.txt"])
+def test_unmatched_heuristic_pattern_is_an_error(tmp_path, pattern):
+    file_statespace = tmp_path / "statespace.txt"
+    file_statespace.write_text("s\ng\ns: g,1\ng:\n")
+    res = subprocess.run([sys.executable, SOLUTION, "--ss", str(file_statespace), "--alg", "astar", "--h", str(tmp_path / pattern),
+                          "--no-cache"], capture_output=True, text=True, timeout=60)
+    assert res.returncode == 2
+    assert "no heuristic descriptor files match" in res.stderr
+    assert "Traceback" not in res.stderr
+
+
+# Real-time search has to stop when no goal can be reached, and must not wander into states that cannot reach one
+@pytest.mark.parametrize("statespace, budget, found", [
+    ("".join(["s0\ngoal\n"] + ["s{}: s{},1\n".format(i, (i + 1) % 40) for i in range(40)] + ["goal:\n"]), 4, "no"),
+    ("s0\ng\ns0: d0,1 a,5\nd0: d1,1\nd1: d0,1\na: g,1\ng:\n", 1, "yes"),
+], ids=["unsolvable cycle", "dead-end cycle"])
+def test_rtaa_star_terminates(tmp_path, statespace, budget, found):
+    file_statespace = tmp_path / "statespace.txt"
+    file_statespace.write_text(statespace)
+    output = run(SOLUTION, "--ss", file_statespace, "--alg", "rtaastar", "--budget", budget)
+    assert field(output, "FOUND_SOLUTION") == found
+    assert field(output, "PATH") in (None, "s0 => a => g")
+
+
+# The limits on the search also stop real-time search, which then reports the way the agent went so far
+def test_rtaa_star_respects_max_expansions():
+    file_statespace = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lab1_maps", "istra.txt")
+    output = run(SOLUTION, "--ss", file_statespace, "--alg", "rtaastar", "--budget", "1", "--max-expansions", "3")
+    assert field(output, "FOUND_SOLUTION") == "aborted"
+    assert field(output, "ABORT_REASON") == "max_expansions"
+    assert field(output, "STATES_VISITED") == "3"
+
+
+# Every search but HDA-star stops after the given number of expansions. The external searches check the limits between
+# levels and batches, so they may go a little past them
+@pytest.mark.parametrize("args, visited", [
+    (("--alg", "bfs"), "2"), (("--alg", "ucs"), "2"), (("--alg", "astar", "--h", "{h}"), "2"), (("--alg", "wastar", "--h", "{h}"), "2"),
+    (("--alg", "bidir-ucs"), "2"), (("--alg", "bidir-bfs"), "2"), (("--alg", "idastar", "--h", "{h}"), "2"),
+    (("--alg", "smastar", "--h", "{h}"), "2"), (("--alg", "arastar", "--h", "{h}"), "2"), (("--alg", "ch"), "2"),
+    (("--alg", "lpastar"), "2"), (("--alg", "bfs", "--external"), None), (("--alg", "ucs", "--external"), None),
+], ids=lambda value: " ".join(value) if isinstance(value, tuple) else None)
+def test_searches_respect_max_expansions(args, visited):
+    directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lab1_maps")
+    file_heuristic = os.path.join(directory, "istra_heuristic.txt")
+    output = run(SOLUTION, "--ss", os.path.join(directory, "istra.txt"), *(arg.format(h=file_heuristic) for arg in args),
+                 "--max-expansions", "2")
+    assert field(output, "FOUND_SOLUTION") == "aborted"
+    assert field(output, "ABORT_REASON") == "max_expansions"
+    if visited is not None:
+        assert field(output, "STATES_VISITED") == visited
+
+
+# A-star counts the expansions of reopened states against the limit, although a reopened state is visited only once
+@pytest.mark.parametrize("expansions, found", [(5, "aborted"), (6, "yes")])
+def test_a_star_limit_counts_reopened_states(tmp_path, expansions, found):
+    file_statespace = tmp_path / "statespace.txt"
+    file_statespace.write_text("s\ng\ns: a,1 b,1\na: c,1\nb: c,3\nc: g,10\ng:\n")
+    file_heuristic = tmp_path / "heuristic.txt"
+    file_heuristic.write_text("s: 0\na: 5\nb: 0\nc: 0\ng: 0\n")
+    output = run(SOLUTION, "--ss", file_statespace, "--alg", "astar", "--h", file_heuristic, "--max-expansions", expansions)
+    assert field(output, "FOUND_SOLUTION") == found
+    assert field(output, "STATES_VISITED") == ("4" if found == "aborted" else "5")
+
+
+# HDA-star spreads its expansions over worker processes, limits on them are refused
+def test_hda_star_refuses_limits():
+    directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lab1_maps")
+    res = subprocess.run([sys.executable, SOLUTION, "--ss", os.path.join(directory, "istra.txt"), "--alg", "hdastar", "--h",
+                          os.path.join(directory, "istra_heuristic.txt"), "--max-expansions", "2", "--no-cache"],
+                         capture_output=True, text=True, timeout=60)
+    assert res.returncode == 2
+    assert "not available with the hdastar algorithm" in res.stderr
+
+
+# Function that imports Lab1/solution.py as a module, for the tests that use its classes directly
+def solution_module():
+    spec = importlib.util.spec_from_file_location("lab1_solution", SOLUTION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# The server builds the contraction hierarchy of a state space on the first ch request, once even when requests come in
+# together, and every later request and heuristic variant shares it
+def test_server_builds_hierarchy_on_first_request(statespaces, baseline, monkeypatch):
+    module = solution_module()
+    builds = []
+    build_hierarchy = module.StateSpace.build_hierarchy
+    monkeypatch.setattr(module.StateSpace, "build_hierarchy", lambda self, *args: builds.append(self) or build_hierarchy(self, *args))
+    spaces = [module.StateSpace(statespaces[seed][0], use_cache=False) for seed in SEEDS]
+    server = module.SearchServer(spaces, [statespaces[seed][1] for seed in SEEDS], 1000)
+    assert builds == []
+    json.loads(server.answer(json.dumps({"ss": statespaces[0][0], "alg": "ucs"})))
+    assert builds == []
+    threads = [threading.Thread(target=server.answer, args=(json.dumps({"ss": statespaces[0][0], "alg": "ch"}),)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert builds == [spaces[0]]
+    for _ in range(2):
+        for seed in SEEDS:
+            response = json.loads(server.answer(json.dumps({"ss": statespaces[seed][0], "alg": "ch"})))
+            expected = baseline[seed, "ucs"]
+            assert response["found"] == (field(expected, "FOUND_SOLUTION") == "yes")
+            if response["found"]:
+                assert str(response["cost"]) == field(expected, "TOTAL_COST")
+    response = json.loads(server.answer(json.dumps({"ss": statespaces[0][0], "alg": "ch", "goals": [spaces[0].init]})))
+    assert response["found"] and response["cost"] == 0
+    assert builds == spaces
+
+
+# A compiled contraction hierarchy is mapped when the server starts, and no request has to build one
+def test_server_maps_compiled_hierarchy(tmp_path, monkeypatch):
+    file_statespace, _ = random_statespace(str(tmp_path), 0)
+    res = subprocess.run([sys.executable, SOLUTION, "--ss", file_statespace, "--alg", "ch", "--compile-cache"],
+                         capture_output=True, text=True, timeout=60)
+    assert res.returncode == 0, res.stderr
+    module = solution_module()
+    monkeypatch.setattr(module.StateSpace, "build_hierarchy", lambda self, *args: pytest.fail("the hierarchy was built"))
+    space = module.StateSpace(file_statespace)
+    server = module.SearchServer([space], [], 1000)
+    assert space.cached_hierarchy() is not None
+    response = json.loads(server.answer(json.dumps({"alg": "ch"})))
+    assert "error" not in response
+
+
+# A-star pushes every successor that is not closed - a successor that is closed counts as a duplicate, and the entry left
+# behind by a state that was reached again more cheaply counts as a stale pop when it leaves the frontier
+def test_stats_count_duplicates_and_stale_pops(tmp_path):
+    file_statespace = tmp_path / "statespace.txt"
+    file_statespace.write_text("s\ng\ns: a,1 b,5\na: b,1 s,1\nb: c,1\nc: g,5\ng:\n")
+    file_heuristic = tmp_path / "heuristic.txt"
+    file_heuristic.write_text("s: 0\na: 0\nb: 0\nc: 0\ng: 0\n")
+    file_stats = tmp_path / "stats.json"
+    run(SOLUTION, "--ss", file_statespace, "--alg", "astar", "--h", file_heuristic, "--stats", file_stats)
+    record, = json.loads(file_stats.read_text())["searches"]
+    assert (record["expansions"], record["generations"], record["duplicates"], record["stale_pops"]) == (4, 6, 1, 1)
+
+
+# SMA-star generates one successor at a time, so a node with many successors does not need room for all of them, and a
+# budget too small for any solution ends the search as aborted, not with no solution
+@pytest.mark.parametrize("budget, found", [(1, "aborted"), (2, "aborted"), (3, "yes"), (4, "yes")])
+def test_sma_star_generates_one_successor_at_a_time(tmp_path, budget, found):
+    file_statespace = tmp_path / "statespace.txt"
+    file_statespace.write_text("s\ng\ns: a,1 b,1 c,1 d,1\na: g,1\nb:\nc:\nd:\ng:\n")
+    file_heuristic = tmp_path / "heuristic.txt"
+    file_heuristic.write_text("s: 0\na: 0\nb: 0\nc: 0\nd: 0\ng: 0\n")
+    output = run(SOLUTION, "--ss", file_statespace, "--alg", "smastar", "--h", file_heuristic, "--node-budget", budget)
+    assert field(output, "FOUND_SOLUTION") == found
+    if found == "yes":
+        assert (field(output, "TOTAL_COST"), field(output, "PATH")) == ("2.0", "s => a => g")
+    else:
+        assert field(output, "ABORT_REASON") == "node_budget"
+
+
+# With room for the nodes of an optimal path SMA-star finds a solution at the optimal cost, however many nodes it has to
+# drop on the way. With less room it may find a costlier one or abort, but never reports that there is no solution
+@pytest.mark.parametrize("slack", [-1, 0, 1, 3])
+@pytest.mark.parametrize("seed", SEEDS)
+def test_sma_star_small_budgets_match_ucs(statespaces, baseline, seed, slack):
+    file_statespace, file_heuristic = statespaces[seed]
+    expected = baseline[seed, "ucs"]
+    length = int(field(expected, "PATH_LENGTH") or 2)
+    output = run(SOLUTION, "--ss", file_statespace, "--alg", "smastar", "--h", file_heuristic, "--node-budget", max(1, length + slack))
+    if field(expected, "FOUND_SOLUTION") != "yes":
+        assert field(output, "FOUND_SOLUTION") in ("no", "aborted")
+    elif slack < 0:
+        assert field(output, "FOUND_SOLUTION") in ("yes", "aborted")
+        if field(output, "FOUND_SOLUTION") == "yes":
+            assert float(field(output, "TOTAL_COST")) >= float(field(expected, "TOTAL_COST"))
+    else:
+        assert field(output, "FOUND_SOLUTION") == "yes"
+        assert float(field(output, "TOTAL_COST")) == float(field(expected, "TOTAL_COST"))
+
+
+# The frontier-at-a-time engines give the whole-space tables of the one-at-a-time searches: level BFS the costs and parents
+# of BFS run until no state is left, and delta-stepping the distances of Dijkstra's algorithm with a parent on a cheapest
+# path, the one UCS picks when cheapest paths are unique. Costs drawn from a continuous range make them unique
+@pytest.mark.parametrize("unique", [False, True], ids=["integer costs", "unique paths"])
+@pytest.mark.parametrize("seed", SEEDS)
+def test_whole_space_tables_match_scalar_searches(tmp_path, seed, unique):
+    module = solution_module()
+    file_statespace, _ = random_statespace(str(tmp_path), seed)
+    if unique:
+        rng = random.Random(seed)
+        lines = open(file_statespace).read().splitlines()
+        with open(file_statespace, "w") as output_file:
+            output_file.write("\n".join(lines[:3]) + "\n")
+            for line in lines[3:]:
+                name, transitions = line.split(":")
+                output_file.write("{}:{}\n".format(name, "".join(" {},{}".format(transition.split(",")[0], rng.uniform(0.5, 10))
+                                                                 for transition in transitions.split())))
+    space = module.StateSpace(file_statespace, use_cache=False)
+    exhaustive = module.StateSpace(file_statespace, use_cache=False)
+    exhaustive.goal_ids = set() # Searches without goals fill their tables for every reachable state
+    begin = space.init_id
+    g, parent = space.level_table([begin], *space.search_graph(True))
+    res = exhaustive.bfs_traverse(begin)
+    assert (list(g), list(parent)) == (list(res.cost), list(res.parent))
+    for delta in (None, 0.5, 100):
+        g, parent = space.bucket_table([begin], *space.search_graph(), delta)
+        assert list(g) == list(space.dijkstra([begin], True))
+        for state in range(len(g)):
+            if parent[state] != -1:
+                assert any(space.targets[i] == state and g[parent[state]] + space.costs[i] == g[state]
+                           for i in range(space.offsets[parent[state]], space.offsets[parent[state] + 1]))
+        if unique:
+            assert list(parent) == list(exhaustive.ucs_traverse(begin).parent)
+    g, _ = space.bucket_table(sorted(space.goal_ids), space.transpose_offsets, space.transpose_targets, space.transpose_costs)
+    assert list(g) == list(space.dijkstra())
+
+
+# Function that rewrites the initial state of a state space descriptor file, the rest of the file is kept
+def with_init(file_statespace, init, file_name):
+    lines = open(file_statespace).read().splitlines(True)
+    lines[1] = init + "\n"
+    with open(file_name, "w") as output_file:
+        output_file.write("".join(lines))
+    return file_name
+
+
+# Landmarks are chosen from the graph alone, and their compiled cache stays fresh when only the initial state changes but
+# not when a transition does
+def test_landmarks_only_depend_on_the_graph(tmp_path, monkeypatch):
+    module = solution_module()
+    file_statespace, _ = random_statespace(str(tmp_path), 3)
+    space = module.StateSpace(file_statespace, use_cache=False)
+    other = module.StateSpace(with_init(file_statespace, space.names[-1], str(tmp_path / "other.txt")), use_cache=False)
+    assert list(space.landmarks(3)[0]) == list(other.landmarks(3)[0])
+    res = subprocess.run([sys.executable, SOLUTION, "--ss", file_statespace, "--alg", "astar", "--landmarks", "3", "--compile-cache"],
+                         capture_output=True, text=True, timeout=60)
+    assert res.returncode == 0, res.stderr
+    with_init(file_statespace, space.names[-1], file_statespace)
+    computed = []
+    compute_landmarks = module.StateSpace.compute_landmarks
+    monkeypatch.setattr(module.StateSpace, "compute_landmarks", lambda self, count: computed.append(count) or compute_landmarks(self, count))
+    assert list(module.StateSpace(file_statespace).landmarks(3)[0]) == list(space.landmarks(3)[0])
+    assert computed == []
+    with open(file_statespace, "a") as output_file:
+        output_file.write("extra: {},1\n".format(space.names[0]))
+    module.StateSpace(file_statespace).landmarks(3)
+    assert computed == [3]
+
+
+# A-star with landmarks searches from every state given with --start, at the cost UCS finds from that state
+@pytest.mark.parametrize("seed", SEEDS[:4])
+def test_landmarks_from_start_states(tmp_path, seed):
+    file_statespace, _ = random_statespace(str(tmp_path), seed)
+    names = [line.split(":")[0] for line in open(file_statespace).read().splitlines()[3:]]
+    for start in names[::5]:
+        expected = run(BASELINE, "--ss", with_init(file_statespace, start, str(tmp_path / "start.txt")), "--alg", "ucs")
+        output = run(SOLUTION, "--ss", file_statespace, "--alg", "astar", "--landmarks", "2", "--start", start)
+        assert field(output, "FOUND_SOLUTION") == field(expected, "FOUND_SOLUTION")
+        assert field(output, "TOTAL_COST") == field(expected, "TOTAL_COST")
+    res = subprocess.run([sys.executable, SOLUTION, "--ss", file_statespace, "--alg", "astar", "--landmarks", "2", "--start", "nowhere"],
+                         capture_output=True, text=True, timeout=60)
+    assert res.returncode == 2
+    assert "unknown start state nowhere" in res.stderr
+
+
+# The server answers alt requests with A-star on landmarks computed once per state space, for any start and goals
+def test_server_answers_alt_requests(statespaces, baseline, monkeypatch):
+    module = solution_module()
+    computed = []
+    compute_landmarks = module.StateSpace.compute_landmarks
+    monkeypatch.setattr(module.StateSpace, "compute_landmarks", lambda self, count: computed.append(count) or compute_landmarks(self, count))
+    spaces = [module.StateSpace(statespaces[seed][0], use_cache=False) for seed in SEEDS]
+    server = module.SearchServer(spaces, [], 1000, landmark_count=2)
+    for _ in range(2):
+        for seed in SEEDS:
+            response = json.loads(server.answer(json.dumps({"ss": statespaces[seed][0], "alg": "alt"})))
+            expected = baseline[seed, "ucs"]
+            assert response["found"] == (field(expected, "FOUND_SOLUTION") == "yes")
+            if response["found"]:
+                assert str(response["cost"]) == field(expected, "TOTAL_COST")
+    assert computed == [2] * len(SEEDS)
+    space = spaces[0]
+    for start in space.names:
+        request = {"ss": statespaces[0][0], "alg": "alt", "start": start, "goals": [space.init], "landmarks": 3}
+        response = json.loads(server.answer(json.dumps(request)))
+        cost = space.dijkstra([space.ids[start]], True)[space.init_id]
+        assert response["found"] == (cost != float("inf"))
+        if response["found"]:
+            assert response["cost"] == cost
+    assert computed == [2] * len(SEEDS) + [3]
+    assert "error" in json.loads(server.answer(json.dumps({"ss": statespaces[0][0], "alg": "alt", "landmarks": 0})))
+
+
+# Function that runs Lab1/solution.py with its result cache - returns the output
+def run_cached(*args):
+    res = subprocess.run([sys.executable, SOLUTION] + list(map(str, args)), capture_output=True, text=True, timeout=60)
+    assert res.returncode == 0, res.stderr
+    return res.stdout
+
+
+# A repeated run prints the stored report, a run on a changed state space file searches again, and a result cache that
+# cannot be created only means that nothing is stored
+def test_result_cache(tmp_path):
+    file_statespace, _ = random_statespace(str(tmp_path), 1)
+    file_cache = tmp_path / "cache" / "results.sqlite"
+    first = run_cached("--ss", file_statespace, "--alg", "ucs", "--result-cache", file_cache)
+    assert first == subprocess.run([sys.executable, SOLUTION, "--ss", file_statespace, "--alg", "ucs", "--no-cache"],
+                                   capture_output=True, text=True, timeout=60).stdout
+    with sqlite3.connect(str(file_cache)) as connection: # A marked report shows that the next run does not search
+        assert connection.execute("UPDATE results SET report = report || '# stored\n'").rowcount == 1
+    assert run_cached("--ss", file_statespace, "--alg", "ucs", "--result-cache", file_cache) == first + "# stored\n"
+    with open(file_statespace, "a") as output_file:
+        output_file.write("extra:\n")
+    assert run_cached("--ss", file_statespace, "--alg", "ucs", "--result-cache", file_cache) == first
+    with sqlite3.connect(str(file_cache)) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM results").fetchone()[0] == 2
+    blocked = tmp_path / "blocked"
+    blocked.write_text("not a directory\n")
+    assert run_cached("--ss", file_statespace, "--alg", "ucs", "--result-cache", blocked / "results.sqlite") == first
+    assert blocked.read_text() == "not a directory\n"
+
+
+# Function that splits an output with several reports at their headers - returns the parsed reports
+def parse_reports(output):
+    return [parse_output("# " + report) for report in output[2:].split("\n# ")] if output.startswith("# ") else []
+
+
+# After every batch of random edits LPA-star reports what UCS finds on a descriptor file with the edits applied
+@pytest.mark.parametrize("seed", SEEDS[:6])
+def test_lpa_star_replans_match_ucs(tmp_path, seed):
+    rng = random.Random(seed)
+    file_statespace, _ = random_statespace(str(tmp_path), seed)
+    lines = open(file_statespace).read().splitlines()
+    transitions = dict() # The cheapest transition between two states, which an edit replaces
+    for line in lines[3:]:
+        name, successors = line.split(":")
+        transitions[name] = dict()
+        for successor in successors.split():
+            target, cost = successor.split(",")
+            transitions[name][target] = min(int(cost), transitions[name].get(target, int(cost)))
+    names = list(transitions)
+    edits, expected = [], []
+    for _ in range(4):
+        for _ in range(rng.randint(1, 6)):
+            source = rng.choice(names)
+            target = rng.choice(names)
+            if target not in transitions[source]:
+                transitions[source][target] = rng.randint(0, 9)
+                edits.append("insert {} {} {}".format(source, target, transitions[source][target]))
+            elif rng.random() < 0.5:
+                del transitions[source][target]
+                edits.append("delete {} {}".format(source, target))
+            else:
+                transitions[source][target] = rng.randint(0, 9)
+                edits.append("update {} {} {}".format(source, target, transitions[source][target]))
+        edits.append("replan")
+        file_edited = tmp_path / "edited.txt"
+        with open(str(file_edited), "w") as output_file:
+            output_file.write("\n".join(lines[:3]) + "\n")
+            for name in names:
+                output_file.write("{}:{}\n".format(name, "".join(" {},{}".format(target, cost) for target, cost in transitions[name].items())))
+        expected.append(run(BASELINE, "--ss", file_edited, "--alg", "ucs"))
+    file_edits = tmp_path / "edits.txt"
+    file_edits.write_text("\n".join(edits) + "\n")
+    res = subprocess.run([sys.executable, SOLUTION, "--ss", file_statespace, "--alg", "lpastar", "--edits", file_edits, "--no-cache"],
+                         capture_output=True, text=True, timeout=60)
+    assert res.returncode == 0, res.stderr
+    reports = parse_reports(res.stdout)
+    assert len(reports) == len(expected) + 1
+    for output, expected_output in zip(reports[1:], expected):
+        assert field(output, "FOUND_SOLUTION") == field(expected_output, "FOUND_SOLUTION")
+        assert field(output, "TOTAL_COST") == field(expected_output, "TOTAL_COST")
+
+
+# Edits naming states or transitions that do not exist are reported with their line instead of a traceback
+@pytest.mark.parametrize("edit", ["delete Labin Nowhere", "update s00 s00 1 2", "insert s00 s01 -1"])
+def test_lpa_star_rejects_bad_edits(tmp_path, edit):
+    file_statespace, _ = random_statespace(str(tmp_path), 0)
+    file_edits = tmp_path / "edits.txt"
+    file_edits.write_text("# Comment\n{}\n".format(edit))
+    res = subprocess.run([sys.executable, SOLUTION, "--ss", file_statespace, "--alg", "lpastar", "--edits", file_edits, "--no-cache"],
+                         capture_output=True, text=True, timeout=60)
+    assert res.returncode == 2
+    assert "{}:2: ".format(file_edits) in res.stderr
+    assert "Traceback" not in res.stderr
+
+
+# A compiled cache is still used after its descriptor file is only touched, since its digest matches, and a descriptor file
+# that was edited is parsed again, also when its size stays the same
+def test_cache_is_rebuilt_after_edits(tmp_path, monkeypatch):
+    module = solution_module()
+    file_statespace, file_heuristic = random_statespace(str(tmp_path), 2)
+    module.StateSpace(file_statespace, file_heuristic, use_cache=False).compile_cache()
+    parsed = []
+    for method in ("parse_statespace", "parse_heuristic"):
+        parse = getattr(module.StateSpace, method)
+        monkeypatch.setattr(module.StateSpace, method, lambda self, parse=parse, method=method: parsed.append(method) or parse(self))
+    later = os.stat(file_statespace).st_mtime_ns + 10 ** 9
+    for file_name in (file_statespace, file_heuristic):
+        os.utime(file_name, ns=(later, later))
+    space = module.StateSpace(file_statespace, file_heuristic)
+    assert parsed == []
+    fresh = module.StateSpace(file_statespace, file_heuristic, use_cache=False)
+    assert (list(space.costs), list(space.h)) == (list(fresh.costs), list(fresh.h))
+    text = open(file_statespace).read()
+    position = text.index(",") + 1 # The cost of the first transition gets another digit
+    edited = text[:position] + ("2" if text[position] == "1" else "1") + text[position + 1:]
+    with open(file_statespace, "w") as output_file:
+        output_file.write(edited)
+    parsed.clear()
+    space = module.StateSpace(file_statespace, file_heuristic)
+    assert parsed == ["parse_statespace", "parse_heuristic"] # The heuristic cache belongs to the state space it was built for
+    assert list(space.costs) == list(module.StateSpace(file_statespace, use_cache=False).costs) != list(fresh.costs)
+
+
+# The oracle heuristic read back from a compiled cache is the one computed from the descriptor file, with no search
+@pytest.mark.parametrize("seed", SEEDS)
+def test_persisted_oracle_matches_fresh_computation(tmp_path, seed, monkeypatch):
+    module = solution_module()
+    file_statespace, _ = random_statespace(str(tmp_path), seed)
+    module.StateSpace(file_statespace, use_cache=False).compile_cache()
+    expected = list(module.StateSpace(file_statespace, use_cache=False).oracle_heuristic())
+    assert all(expected[goal] == 0 for goal in module.StateSpace(file_statespace, use_cache=False).goal_ids)
+    monkeypatch.setattr(module.StateSpace, "dijkstra", lambda self, *args: pytest.fail("h* was computed again"))
+    space = module.StateSpace(file_statespace)
+    assert list(space.oracle_heuristic()) == expected
+
+
+# Heuristics evaluated by worker processes are reported exactly as when they are evaluated one after another, in order
+@pytest.mark.parametrize("alg", ["astar", "idastar", "wastar"])
+@pytest.mark.parametrize("seed", SEEDS[:4])
+def test_parallel_heuristics_match_serial_output(tmp_path, seed, alg):
+    file_statespace, file_heuristic = random_statespace(str(tmp_path), seed)
+    names = [line.split(":")[0] for line in open(file_statespace).read().splitlines()[3:]]
+    heuristics = [file_heuristic]
+    for value in (0, 1, 3):
+        heuristics.append(str(tmp_path / "h_{}.txt".format(value)))
+        with open(heuristics[-1], "w") as output_file:
+            output_file.write("".join("{}: {}\n".format(name, value) for name in names))
+    outputs = []
+    for jobs in (1, 3):
+        res = subprocess.run([sys.executable, SOLUTION, "--ss", file_statespace, "--alg", alg, "--h"] + heuristics +
+                             ["--check-optimistic", "--check-consistent", "--jobs", str(jobs), "--no-cache"],
+                             capture_output=True, text=True, timeout=60)
+        assert res.returncode == 0, res.stderr
+        outputs.append(res.stdout)
+    assert outputs[0] == outputs[1]
+    assert outputs[0].count("# A-STAR" if alg == "astar" else "# ") >= len(heuristics)
+
+
+DOMAINS = os.path.join(ROOT, "Lab1", "lab1_files", "domains")
+
+
+# Function that writes the state space descriptor file of the states a domain reaches from its initial state - returns
+# its file name
+def enumerate_domain(domain, file_name):
+    start = domain.initial_state()
+    transitions = {start: list(domain.successors(start))}
+    opened = [start]
+    while opened:
+        for child, _ in transitions[opened.pop()]:
+            if child not in transitions:
+                transitions[child] = list(domain.successors(child))
+                opened.append(child)
+    with open(file_name, "w") as output_file:
+        output_file.write("{}\n{}\n".format(domain.name(start), " ".join(domain.name(state) for state in transitions if domain.is_goal(state))))
+        for state, successors in transitions.items():
+            output_file.write("{}:{}\n".format(domain.name(state), "".join(" {},{:g}".format(domain.name(child), cost) for child, cost in successors)))
+    return file_name
+
+
+# The sliding puzzle domain is loaded from its file with keyword arguments and moves the blank to every neighbouring cell
+# at cost 1. Searching the 2x2 puzzle gives the same reports as searching the descriptor file of the states it reaches, the
+# 3x3 puzzle is too large for the baseline, so there A-star with the Manhattan distance is compared with UCS
+@pytest.mark.parametrize("start", ["x2_13", "3x_21", "12_3x", "23_1x", "123_456_x78", "413_726_x58"])
+def test_sliding_puzzle_domain(tmp_path, start):
+    module = solution_module()
+    domain_file = os.path.join(DOMAINS, "sliding_puzzle.py")
+    puzzle = module.load_domain(domain_file + ":SlidingPuzzle", ["start=" + start])
+    state = puzzle.initial_state()
+    assert puzzle.name(state) == start and puzzle.parse(start) == state
+    size = puzzle.size
+    blank = state.index(0)
+    row, column = divmod(blank, size)
+    expected = []
+    for position in (blank - size, blank + size, blank - 1, blank + 1):
+        if 0 <= position < size * size and (position // size == row or position % size == column):
+            child = list(state)
+            child[blank], child[position] = child[position], 0
+            expected.append((tuple(child), 1.0))
+    assert sorted(puzzle.successors(state)) == sorted(expected)
+    assert puzzle.is_goal(tuple(range(1, size * size)) + (0,))
+    arguments = ("--domain", domain_file + ":SlidingPuzzle", "--domain-args", "start=" + start)
+    if size > 2:
+        output = run(SOLUTION, *arguments, "--alg", "astar")
+        expected_output = run(SOLUTION, *arguments, "--alg", "ucs")
+        assert field(output, "TOTAL_COST") == field(expected_output, "TOTAL_COST")
+        return
+    file_statespace = enumerate_domain(puzzle, str(tmp_path / "puzzle.txt"))
+    for alg in ("bfs", "ucs"):
+        output = run(SOLUTION, *arguments, "--alg", alg)
+        expected_output = run(BASELINE, "--ss", file_statespace, "--alg", alg)
+        for name in ("FOUND_SOLUTION", "PATH_LENGTH", "TOTAL_COST") + (("STATES_VISITED", "PATH") if alg == "bfs" else ()):
+            assert field(output, name) == field(expected_output, name), name
+
+
+# Pattern database values are at most the exact solution costs of the states near the goal, and they are consistent, which
+# with a value of 0 at the goal makes them admissible everywhere. Additive databases also dominate the Manhattan distance
+@pytest.mark.parametrize("heuristic, partition", [("additive", None), ("additive", "1,2/3,4,5/6,7,8"), ("max", None), ("max", "1,3,5,7/2,4,6,8")])
+def test_pattern_databases_are_admissible(tmp_path, heuristic, partition):
+    module = solution_module()
+    domain_file = os.path.join(DOMAINS, "sliding_puzzle.py")
+    arguments = ["heuristic=" + heuristic, "pdb_directory=" + str(tmp_path)] + (["partition=" + partition] if partition else [])
+    puzzle = module.load_domain(domain_file + ":SlidingPuzzle", arguments)
+    manhattan = module.load_domain(domain_file + ":SlidingPuzzle")
+    assert puzzle.heuristic(puzzle.goal) == 0
+    distances = {puzzle.goal: 0} # Exact costs to the goal of the states at most 12 moves from it
+    layer = [puzzle.goal]
+    for distance in range(1, 13):
+        layer = [child for state in layer for child, _ in puzzle.successors(state) if child not in distances]
+        for state in layer:
+            distances.setdefault(state, distance)
+    for state, distance in distances.items():
+        assert puzzle.heuristic(state) <= distance
+    rng = random.Random(14)
+    states = [puzzle.initial_state()] + rng.sample(sorted(distances), 200)
+    for _ in range(2000): # A random walk reaches states far from the goal
+        states.append(rng.choice(list(puzzle.successors(states[-1])))[0])
+    for state in states:
+        value = puzzle.heuristic(state)
+        for child, cost in puzzle.successors(state):
+            assert value <= cost + puzzle.heuristic(child)
+        if heuristic == "additive":
+            assert value >= manhattan.heuristic(state)
+    assert os.listdir(str(tmp_path)) # The tables are kept for later runs
+    reloaded = module.load_domain(domain_file + ":SlidingPuzzle", arguments)
+    assert [reloaded.heuristic(state) for state in states] == [puzzle.heuristic(state) for state in states]
+
+
+# The server checks the weight of weighted A-star requests like the command line checks --w
+@pytest.mark.parametrize("weight, valid", [(0.5, False), (0, False), (-2, False), ("nan", False), (1, True), (3.5, True)])
+def test_server_checks_weights(statespaces, weight, valid):
+    module = solution_module()
+    file_statespace, file_heuristic = statespaces[0]
+    server = module.SearchServer([module.StateSpace(file_statespace, use_cache=False)], [file_heuristic], 1000)
+    response = json.loads(server.answer(json.dumps({"alg": "wastar", "w": weight})))
+    assert ("error" not in response) == valid
+    if valid:
+        assert response["bound"] == float(weight)
+    else:
+        assert "w has to be at least 1" in response["error"]
+
+
+# A heuristic file whose name glob would read as a pattern is used as it is, and a pattern still matches its files
+@pytest.mark.parametrize("names, argument", [(["h[1].txt"], "h[1].txt"), (["h[1].txt", "h1.txt"], "h[1].txt"), (["h1.txt", "h2.txt"], "h[12].txt")])
+def test_heuristic_file_names_with_glob_characters(tmp_path, names, argument):
+    file_statespace = tmp_path / "statespace.txt"
+    file_statespace.write_text("s\ng\ns: g,1\ng:\n")
+    for name in names:
+        (tmp_path / name).write_text("s: 1\ng: 0\n")
+    res = subprocess.run([sys.executable, SOLUTION, "--ss", str(file_statespace), "--alg", "astar", "--h", str(tmp_path / argument),
+                          "--no-cache"], capture_output=True, text=True, timeout=60)
+    assert res.returncode == 0, res.stderr
+    expected = [argument] if argument in names else names
+    assert [line.split()[2] for line in res.stdout.splitlines() if line.startswith("# A-STAR")] == [str(tmp_path / name) for name in expected]